@@ -1,20 +1,19 @@
 from datetime import date
 import hashlib
-import logging.handlers
+import logging
 import re
 from urlparse import urlsplit, urlunsplit, urljoin
 
-import requests
-from lxml import html
-from juriscraper.lib.string_utils import harmonize, clean_string, trunc
-from juriscraper.tests import MockRequest
+from lxml import etree, html
+from juriscraper.lib.results import ResultBatch
+from juriscraper.lib.stats_utils import SiteStats
+from juriscraper.lib.string_utils import clean_strings, harmonize_strings, \
+    trunc
+from juriscraper.lib.xpath_utils import compile_xpath
 
-
-try:
-    # Use cchardet for performance to detect the character encoding.
-    import cchardet as chardet
-except ImportError:
-    import chardet
+# requests (via lib.http_utils), chardet and juriscraper.tests take longer to
+# import than everything else here put together, and many processes never
+# download anything, so they're imported where they're first needed.
 
 LOG_FILENAME = '/var/log/juriscraper/debug.log'
 
@@ -25,10 +24,44 @@ logger.setLevel(logging.DEBUG)
 # make a formatter
 formatter = logging.Formatter('%(asctime)s - %(levelname)s: %(message)s')
 
+
+class DeferredFileHandler(logging.Handler):
+    """Logs to a RotatingFileHandler that is only set up the first time
+    something is logged, so importing this module neither imports
+    logging.handlers nor opens the log file.
+    """
+    def __init__(self, filename, **kwargs):
+        logging.Handler.__init__(self)
+        self.filename = filename
+        self.kwargs = kwargs
+        self.handler = None
+
+    def emit(self, record):
+        # Handler.handle() holds our lock while this runs. A log file that
+        # can't be opened is reported like any other logging error, rather
+        # than failing whatever was being logged.
+        try:
+            if self.handler is None:
+                import logging.handlers
+                self.handler = logging.handlers.RotatingFileHandler(
+                    self.filename, **self.kwargs)
+                self.handler.setFormatter(self.formatter)
+            self.handler.emit(record)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        if self.handler is not None:
+            self.handler.flush()
+
+    def close(self):
+        if self.handler is not None:
+            self.handler.close()
+        logging.Handler.close(self)
+
+
 # Create a handler, and attach it to the logger
-handler = logging.handlers.RotatingFileHandler(LOG_FILENAME,
-                                               maxBytes=5120000,
-                                               backupCount=7)
+handler = DeferredFileHandler(LOG_FILENAME, maxBytes=5120000, backupCount=7)
 logger.addHandler(handler)
 handler.setFormatter(formatter)
 
@@ -36,17 +69,91 @@ handler.setFormatter(formatter)
 #                    level=logging.DEBUG)
 
 
+# For use in _clean_text
+XML_DECLARATION = re.compile(r'\s*<\?xml\s+.*?\?>')
+INVALID_CHARS = re.compile(u'[^\u0020-\uD7FF\u0009\u000A\u000D\uE000-\uFFFD\u10000-\u10FFFF]+')
+# Every character that INVALID_CHARS matches contains one of these bytes when
+# encoded as UTF-8: the control characters, and the lead bytes of surrogates,
+# of U+FFFE and U+FFFF, and of everything past U+FFFF.
+SUSPICIOUS_BYTES = ''.join(chr(i) for i in range(0x20)
+                           if chr(i) not in '\t\n\r') + '\xed\xef\xf0\xf1\xf2\xf3\xf4'
+
+
+# For use in _link_repl
+LEADING_PARENT_DIRS = re.compile('^(/\.\.)+')
+MAX_LINK_CACHE_SIZE = 10000
+
+
+def _detect_encoding(content):
+    try:
+        # Use cchardet for performance to detect the character encoding.
+        import cchardet as chardet
+    except ImportError:
+        import chardet
+    return chardet.detect(content)['encoding']
+
+
+def _may_have_invalid_chars(text):
+    """Checks for characters that INVALID_CHARS would remove, much faster
+    than the regex can, by looking for their UTF-8 bytes. This can give false
+    positives, but never false negatives.
+    """
+    if isinstance(text, unicode):
+        text = text.encode('utf-8')
+    return len(text.translate(None, SUSPICIOUS_BYTES)) != len(text)
+
+
 class InsanityException(Exception):
     def __init__(self, message):
         Exception.__init__(self, message)
 
 
+class PageUnchangedException(Exception):
+    def __init__(self, message):
+        Exception.__init__(self, message)
+
+
 class AbstractSite(object):
     """Contains generic methods for scraping data. Should be extended by all
     scrapers.
 
     Should not contain lists that can't be sorted by the _date_sort function."""
 
+    # Instead of writing a _get_<attr> method for every attribute, scrapers
+    # whose items are laid out as rows can set row_path to an XPath that
+    # selects one element per item, and row_fields to a dict mapping names to
+    # either an XPath relative to the row (its first result is used, or None)
+    # or a function that takes the row. parse() then walks the rows once,
+    # building every column at the same time, and uses the columns named
+    # after attributes in place of their _get_<attr> methods. All of the
+    # columns, including any that aren't attributes (e.g., seeds for a
+    # DeferringList), are kept in self._columns for the _get_* methods, and
+    # the rows themselves in self._rows. See _keep_row to filter the rows.
+    # The XPaths are compiled once, by lib.xpath_utils. Like row_tag below,
+    # these are class attributes; only a row_fields that uses the Site's own
+    # methods needs to be set in __init__.
+    row_path = None
+    row_fields = {}
+
+    # For very large pages, scrapers can instead set row_tag to stream the
+    # page: it is parsed as it downloads, and every element with that tag
+    # that _keep_row accepts is a row. Each row's fields are read as soon as
+    # the row is complete, and then the row and everything before it are
+    # thrown away, so memory use depends on the size of a row rather than
+    # the size of the page. That means fields may only look at the row and
+    # its ancestors, and should return strings rather than elements. The
+    # whole tree is never built, so self.html is None and self._rows stays
+    # empty. Set stream_format to 'xml' to stream an RSS feed or other XML
+    # instead of HTML. Streamed pages don't go through _clean_text.
+    row_tag = None
+    stream_format = 'html'
+
+    # Normally every link in a page is made absolute as soon as it's
+    # downloaded. Scrapers that only take download_urls from the page's links
+    # can set lazy_links to skip that, and have just the download_urls made
+    # absolute when the results are cleaned.
+    lazy_links = False
+
     def __init__(self):
         super(AbstractSite, self).__init__()
 
@@ -58,6 +165,24 @@ class AbstractSite(object):
         self.status = None
         self.back_scrape_iterable = None
         self.cookies = {}
+        # Set to a lib.cache_utils.ChangeCache to skip unchanged pages.
+        self.change_cache = None
+        self.unchanged = False
+        self._checking_for_changes = False
+        self._page_state = None
+        self._response = None
+        # Set to a lib.cache_utils.ResponseCache to cache the secondary pages
+        # downloaded with _request(). If response_cache_ttl is None, the
+        # cache's default time to live is used.
+        self.response_cache = None
+        self.response_cache_ttl = None
+        # Set to a lib.cache_utils.SeenCache to drop the items that have
+        # already been handled.
+        self.seen_cache = None
+        # Timings and counters from the last call to parse(). Set stats_sink
+        # to a function to have it called with the Site after every parse.
+        self.stats = SiteStats()
+        self.stats_sink = None
 
         # Upstream metadata
         self.court_id = None
@@ -66,6 +191,11 @@ class AbstractSite(object):
         self._opt_attrs = []
         self._req_attrs = []
         self._all_attrs = []
+        self._rows = []
+        self._columns = {}
+        self._link_cache = {}
+        # Cookies set by responses to _send(), made on first use.
+        self._cookie_jar = None
 
     def __str__(self):
         out = []
@@ -73,23 +203,125 @@ class AbstractSite(object):
             out.append('%s: %s' % (attr, val))
         return '\n'.join(out)
 
+    @property
+    def results(self):
+        """The parsed items, as a lib.results.ResultBatch over the Site's
+        attributes. Changes made through it are made to the attributes.
+        """
+        return ResultBatch.from_site(self)
+
     def parse(self):
+        if self.status is None:
+            # Otherwise, the page was downloaded before parse() was called
+            # (e.g., by _download_backwards), and its stats are already here.
+            self.stats = SiteStats()
+        with self.stats.timer('parse'):
+            self._parse()
+        if self.stats_sink is not None:
+            self.stats_sink(self)
+        return self
+
+    def _parse(self):
+        stats = self.stats
+        streamed = False
         if self.status is None:
             # Run the downloader if it hasn't been run already
-            self.html = self._download()
+            self._checking_for_changes = self.change_cache is not None
+            try:
+                if self.row_tag is not None:
+                    with stats.timer('_stream_rows'):
+                        self._stream_rows()
+                    self.html = None
+                    streamed = True
+                else:
+                    with stats.timer('_download'):
+                        self.html = self._download()
+            except PageUnchangedException, e:
+                logger.info(str(e))
+                return self._mark_unchanged()
+            finally:
+                self._checking_for_changes = False
+
+        if self.row_path is not None and not streamed:
+            with stats.timer('_extract_rows'):
+                self._extract_rows()
 
         # Set the attribute to the return value from _get_foo()
         # e.g., this does self.case_names = _get_case_names()
         for attr in self._all_attrs:
-            self.__setattr__(attr, getattr(self, '_get_%s' % attr)())
-
-        self._clean_attributes()
-        self._post_parse()
-        self._check_sanity()
-        self._date_sort()
-        self._make_hash()
+            if attr in self._columns:
+                self.__setattr__(attr, self._columns[attr])
+            else:
+                getter = '_get_%s' % attr
+                with stats.timer(getter):
+                    self.__setattr__(attr, getattr(self, getter)())
+            if hasattr(getattr(self, attr), 'fetch_times'):
+                # A DeferringList, whose values are fetched as they're used,
+                # during the steps below or after parse() returns.
+                getattr(self, attr).record_stats(stats)
+
+        for step in (self._clean_attributes, self._post_parse,
+                     self._check_sanity, self._date_sort, self._make_hash,
+                     self._filter_seen):
+            with stats.timer(step.__name__):
+                step()
+        if self._page_state is not None:
+            self.change_cache.set(hash=self.hash, **self._page_state)
+
+    def _filter_seen(self):
+        """Drops the items the seen_cache already has. This comes after
+        _make_hash, so that the hash still describes the whole page.
+        """
+        if self.seen_cache is not None:
+            count = self.seen_cache.filter(self)
+            if count:
+                logger.info("%s: Skipping %s items seen before." %
+                            (self.court_id, count))
+
+    def _mark_unchanged(self):
+        """Sets up the Site for a page that hasn't changed since it was last
+        parsed: no items, and the hash from last time.
+        """
+        self.unchanged = True
+        self.hash = self.change_cache.get(self._change_cache_key())['hash']
+        for attr in self._all_attrs:
+            self.__setattr__(attr, [])
         return self
 
+    def _change_cache_key(self):
+        if self.method == 'POST':
+            return '%s?%s' % (self.url, sorted(self.parameters.items()))
+        return self.url
+
+    def _check_for_changes(self, r, digest=None):
+        """Raises PageUnchangedException if the response shows that the page
+        is the same as the last time it was parsed. Otherwise, notes its state
+        so it can be saved once parsing succeeds.
+
+        digest is the SHA1 of the page, if it has already been worked out
+        (e.g., while streaming it).
+        """
+        # Only the first page downloaded is checked.
+        self._checking_for_changes = False
+        key = self._change_cache_key()
+        previous = self.change_cache.get(key)
+        if digest is None:
+            digest = hashlib.sha1(r.content).hexdigest()
+        if previous is not None and previous['hash'] is not None:
+            if r.status_code == 304:
+                raise PageUnchangedException(
+                    "%s: Court returned 304 Not Modified." % self.court_id)
+            if digest == previous['digest']:
+                raise PageUnchangedException(
+                    "%s: Page is identical to the last one parsed." %
+                    self.court_id)
+        self._page_state = {
+            'key': key,
+            'etag': r.headers.get('ETag'),
+            'last_modified': r.headers.get('Last-Modified'),
+            'digest': digest,
+        }
+
     def tweak_request_object(self, r):
         """
         Does nothing, but provides a hook that allows inheriting objects to
@@ -104,10 +336,15 @@ class AbstractSite(object):
             3. Replaces </br> with <br/>
             4. Nukes invalid bytes in input
             5. ?
+
+        This runs on every page, so each fix first checks, with a fast scan,
+        whether it is needed at all, and only then copies the text to make it.
         """
         # Remove <![CDATA because it causes breakage in lxml.
-        text = re.sub(r'<!\[CDATA\[', '', text)
-        text = re.sub(r'\]\]>', '', text)
+        if '<![CDATA[' in text:
+            text = text.replace('<![CDATA[', '')
+        if ']]>' in text:
+            text = text.replace(']]>', '')
 
         # Remove <?xml> declaration in Unicode objects, because it causes an error:
         # "ValueError: Unicode strings with encoding declaration are not supported."
@@ -116,32 +353,143 @@ class AbstractSite(object):
         # removing it. This moves our encoding detection to chardet, rather than
         # lxml.
         if isinstance(text, unicode):
-            text = re.sub(r'^\s*<\?xml\s+.*?\?>', '', text)
+            m = XML_DECLARATION.match(text)
+            if m:
+                text = text[m.end():]
 
         # Fix </br>
-        text = re.sub('</br>', '<br/>', text)
+        if '</br>' in text:
+            text = text.replace('</br>', '<br/>')
 
         # Fix invalid bytes (http://stackoverflow.com/questions/8733233/filtering-out-certain-bytes-in-python)
-        text = re.sub(u'[^\u0020-\uD7FF\u0009\u000A\u000D\uE000-\uFFFD\u10000-\u10FFFF]+', '', text)
+        if _may_have_invalid_chars(text):
+            text = INVALID_CHARS.sub('', text)
 
         return text
 
+    def _keep_row(self, row):
+        """Override to skip some of the rows selected by row_path."""
+        return True
+
+    def _compile_row_fields(self, smart_strings=True):
+        fields = []
+        for name, field in self.row_fields.items():
+            if isinstance(field, basestring):
+                field = compile_xpath(field, smart_strings=smart_strings)
+            fields.append((name, field))
+        return fields
+
+    def _read_row(self, row, fields):
+        for name, field in fields:
+            value = field(row)
+            if isinstance(field, etree.XPath) and isinstance(value, list):
+                value = value[0] if value else None
+            self._columns[name].append(value)
+
+    def _extract_rows(self):
+        """Walks the rows selected by row_path in self.html (a tree or a list
+        of trees), building a column for every entry in row_fields.
+        """
+        select_rows = compile_xpath(self.row_path)
+        fields = self._compile_row_fields()
+
+        trees = self.html if isinstance(self.html, list) else [self.html]
+        self._rows = []
+        self._columns = dict((name, []) for name, field in fields)
+        for tree in trees:
+            for row in select_rows(tree):
+                if not self._keep_row(row):
+                    continue
+                self._rows.append(row)
+                self._read_row(row, fields)
+
+    def _make_pull_parser(self, encoding):
+        if self.stream_format == 'xml':
+            return etree.XMLPullParser(events=('end',), tag=self.row_tag,
+                                       encoding=encoding, recover=True)
+        parser = etree.HTMLPullParser(events=('end',), tag=self.row_tag,
+                                      encoding=encoding)
+        parser.set_element_class_lookup(html.HtmlElementClassLookup())
+        return parser
+
+    def _read_streamed_rows(self, parser, fields):
+        for _, row in parser.read_events():
+            if self._keep_row(row):
+                if self.stream_format == 'html' and not self.lazy_links:
+                    row.rewrite_links(self._link_repl)
+                self._read_row(row, fields)
+            # Free the row, along with anything before it or before any of
+            # its ancestors, since all of that is finished.
+            row.clear()
+            node = row
+            parent = node.getparent()
+            while parent is not None:
+                while node.getprevious() is not None:
+                    del parent[0]
+                node = parent
+                parent = node.getparent()
+
+    def _stream_rows(self, request_dict={}, chunk_size=64 * 1024):
+        """Downloads the page, feeding it to a parser a chunk at a time and
+        building a column for every entry in row_fields from each row as it
+        completes. See row_tag.
+        """
+        r = self._get_response(request_dict, stream=True)
+        try:
+            if self._checking_for_changes and r.status_code == 304:
+                self._check_for_changes(r)
+
+            # Without smart strings, the field values don't hold on to the
+            # rows.
+            fields = self._compile_row_fields(smart_strings=False)
+            self._rows = []
+            self._columns = dict((name, []) for name, _ in fields)
+            digest = hashlib.sha1()
+            parser = None
+            for chunk in r.iter_content(chunk_size):
+                if parser is None:
+                    # Without an encoding from the HTTP headers, guess it from
+                    # the first chunk.
+                    encoding = r.encoding or _detect_encoding(chunk)
+                    parser = self._make_pull_parser(encoding)
+                digest.update(chunk)
+                self.stats.add_bytes(len(chunk))
+                parser.feed(chunk)
+                self._read_streamed_rows(parser, fields)
+            if parser is not None:
+                parser.close()
+                self._read_streamed_rows(parser, fields)
+
+            if self._checking_for_changes:
+                self._check_for_changes(r, digest=digest.hexdigest())
+        finally:
+            # Closes the file or connection the body was streamed from.
+            r.close()
+
     def _clean_attributes(self):
         """Iterate over attribute values and clean them"""
         for attr in self._all_attrs:
             item = getattr(self, attr)
-            if item is not None:
-                cleaned_item = []
-                for sub_item in item:
-                    if attr == 'download_urls':
-                        sub_item = sub_item.strip()
-                    else:
-                        if isinstance(sub_item, basestring):
-                            sub_item = clean_string(sub_item)
-                        if attr in ['case_names', 'docket_numbers']:
-                            sub_item = harmonize(sub_item)
-                    cleaned_item.append(sub_item)
-                self.__setattr__(attr, cleaned_item)
+            if item is None:
+                continue
+            if hasattr(item, 'fetch_times'):
+                # A DeferringList. Clean its values as they're fetched,
+                # instead of fetching them all now.
+                item.apply(lambda value, attr=attr:
+                           self._clean_values(attr, [value])[0])
+            else:
+                self.__setattr__(attr, self._clean_values(attr, item))
+
+    def _clean_values(self, attr, values):
+        if attr == 'download_urls':
+            if self.lazy_links:
+                return [self._link_repl(value.strip()).strip()
+                        for value in values]
+            return [value.strip() for value in values]
+        cleaned_values = clean_strings(values)
+        if attr in ['case_names', 'docket_numbers']:
+            cleaned_values = harmonize_strings(cleaned_values)
+        return cleaned_values
 
     def _post_parse(self):
         """This provides an hook for subclasses to do custom work on the data after the parsing is complete."""
@@ -167,10 +515,9 @@ class AbstractSite(object):
         If sanity is OK, no return value. If not, throw InsanityException or
         warnings, as appropriate.
         """
-        lengths = {}
-        for attr in self._all_attrs:
-            if self.__getattribute__(attr) is not None:
-                lengths[attr] = len(self.__getattribute__(attr))
+        results = self.results
+        lengths = dict((name, len(results.column(name)))
+                       for name in results.names)
         values = lengths.values()
         if values.count(values[0]) != len(values):
             # Are all elements equal?
@@ -204,26 +551,20 @@ class AbstractSite(object):
                                                           len(self.case_names)))
 
     def _date_sort(self):
-        """ Sort the object by date.
+        """Sorts the items by date, newest first. Items with the same date
+        keep the order they had on the page.
+
+        The indexes are sorted, and then every column is put in that order in
+        place, so that DeferringLists are reordered without being fetched.
         """
         if len(self.case_names) > 0:
-            obj_list_attrs = [self.__getattribute__(attr) for attr in
-                              self._all_attrs if
-                              isinstance(self.__getattribute__(attr), list)]
-            zipped = zip(*obj_list_attrs)
-            zipped.sort(reverse=True)
-            i = 0
-            obj_list_attrs = zip(*zipped)
-            for attr in self._all_attrs:
-                if isinstance(self.__getattribute__(attr), list):
-                    self.__setattr__(attr, obj_list_attrs[i][:])
-                    i += 1
+            self.results.sort_by('case_dates', reverse=True)
 
     def _make_hash(self):
         """Make a unique ID. ETag and Last-Modified from courts cannot be
         trusted
         """
-        self.hash = hashlib.sha1(str(self.case_names)).hexdigest()
+        self.hash = hashlib.sha1(str(list(self.case_names))).hexdigest()
 
     def _link_repl(self, href):
         """Makes links absolute, working around buggy URLs and nuking anchors.
@@ -242,17 +583,115 @@ class AbstractSite(object):
         around invalid relative URLS, nor remove anchors. This is a limitation
         of Python's urljoin that will be fixed in Python 3.5 according to a bug
         we filed: http://bugs.python.org/issue22118
+
+        Pages link to the same places over and over, so results are cached.
         """
+        key = (self.url, href)
+        url = self._link_cache.get(key)
+        if url is not None:
+            return url
         url_parts = urlsplit(urljoin(self.url, href))
         url = urlunsplit(
             url_parts[:2] +
-            (re.sub('^(/\.\.)+', '', url_parts.path),) +
+            (LEADING_PARENT_DIRS.sub('', url_parts.path),) +
             url_parts[3:]
         )
-        return url.split('#')[0]
+        url = url.split('#')[0]
+        if len(self._link_cache) >= MAX_LINK_CACHE_SIZE:
+            self._link_cache.clear()
+        self._link_cache[key] = url
+        return url
+
+    def _request_kwargs(self, request_dict, conditional=False):
+        """Builds the keyword arguments for requests.request() needed to
+        download the page. If conditional is True and the page is in the
+        change cache, asks the court to send the page only if it has changed.
+        """
+        kwargs = dict(request_dict, method=self.method, url=self.url)
+        if self.method == 'POST':
+            kwargs['data'] = self.parameters
+        if conditional and self.method == 'GET':
+            previous = self.change_cache.get(self._change_cache_key())
+            if previous is not None and previous['hash'] is not None:
+                headers = dict(request_dict.get('headers', {}))
+                if previous['etag']:
+                    headers['If-None-Match'] = previous['etag']
+                if previous['last_modified']:
+                    headers['If-Modified-Since'] = previous['last_modified']
+                kwargs['headers'] = headers
+        return kwargs
+
+    def download_request(self):
+        """Returns the request that parse() would make to download the page,
+        as keyword arguments for requests.request().
+
+        Along with parse_response(), this lets callers that run their own HTTP
+        client (for example one driven by an event loop, with thousands of
+        requests in flight) do the network I/O for the main page of many
+        courts at once, instead of tying up a thread per court.
+        """
+        return self._request_kwargs(
+            {}, conditional=self.change_cache is not None)
 
-    def _download(self, request_dict={}):
-        """Methods for downloading the latest version of Site
+    def parse_response(self, r):
+        """Parses a response that the caller downloaded using the request
+        from download_request(). The response should behave like a requests
+        Response object.
+
+        Scrapers that download further pages or use a DeferringList still do
+        that work themselves, as usual.
+        """
+        self._response = r
+        try:
+            return self.parse()
+        finally:
+            self._response = None
+
+    def _request(self, method, url, **kwargs):
+        """Downloads a secondary page, such as the case pages visited by a
+        DeferringList fetcher, using the shared session for its host. Takes
+        the same arguments as requests.request().
+
+        If the Site has a response_cache, successful responses are served from
+        and saved to it.
+        """
+        cache = self.response_cache
+        if cache is not None:
+            key = cache.make_key(method, url, kwargs.get('data'))
+            r = cache.get(key)
+            if r is not None:
+                logger.info("Using cached response for: %s" % url)
+                return r
+        r = self._send(method, url, **kwargs)
+        self.stats.add_bytes(len(r.content))
+        if cache is not None and r.status_code == 200:
+            cache.set(key, r, ttl=self.response_cache_ttl)
+        return r
+
+    def _send(self, method, url, **kwargs):
+        """Sends a request with the shared session for the URL's host, without
+        any caching. Takes the same arguments as requests.request().
+
+        The shared sessions don't keep cookies, so the Site keeps its own:
+        cookies set by a response are sent with every later request made
+        through here, as they would be by a session of the Site's own. Any
+        cookies passed in are sent as well.
+        """
+        from requests.cookies import RequestsCookieJar, merge_cookies
+        from juriscraper.lib.http_utils import get_session
+        if self._cookie_jar is None:
+            self._cookie_jar = RequestsCookieJar()
+        cookies = self._cookie_jar.copy()
+        if kwargs.get('cookies'):
+            cookies = merge_cookies(cookies, kwargs['cookies'])
+        kwargs['cookies'] = cookies
+        r = get_session(url).request(method, url, **kwargs)
+        self._cookie_jar.update(r.cookies)
+        return r
+
+    def _get_response(self, request_dict={}, stream=False):
+        """Requests the page, returning the response once its status has
+        been checked. With stream, the body isn't read yet.
         """
         if self.method == 'POST':
             truncated_params = {}
@@ -262,19 +701,19 @@ class AbstractSite(object):
         else:
             logger.info("Now downloading case page at: %s" % self.url)
         # Get the response. Disallow redirects so they throw an error
-        s = requests.session()
-        if self.method == 'GET':
-            r = s.get(self.url,
-                      headers={'User-Agent': 'Juriscraper'},
-                      **request_dict)
-        elif self.method == 'POST':
-            r = s.post(self.url,
-                       headers={'User-Agent': 'Juriscraper'},
-                       data=self.parameters,
-                       **request_dict)
+        if self._response is not None:
+            # The caller already downloaded the page. See parse_response().
+            r = self._response
+            self._response = None
+        elif self.method in ('GET', 'POST'):
+            kwargs = self._request_kwargs(
+                request_dict, conditional=self._checking_for_changes)
+            from juriscraper.lib.http_utils import get_session
+            r = get_session(self.url).request(stream=stream, **kwargs)
         elif self.method == 'LOCAL':
+            from juriscraper.tests import MockRequest
             mr = MockRequest(url=self.url)
-            r = mr.get()
+            r = mr.get(stream=stream)
 
         # Provides a hook for inheriting objects to tweak the request object.
         self.tweak_request_object(r)
@@ -289,6 +728,16 @@ class AbstractSite(object):
         # Provide the response in the Site object
         self.r = r
         self.status = r.status_code
+        return r
+
+    def _download(self, request_dict={}):
+        """Methods for downloading the latest version of Site
+        """
+        r = self._get_response(request_dict)
+        self.stats.add_bytes(len(r.content))
+
+        if self._checking_for_changes:
+            self._check_for_changes(r)
 
         if r.encoding is None:
             # Requests detects the encoding when the item is GET'ed using
@@ -299,12 +748,13 @@ class AbstractSite(object):
             # (which would do it with vanilla chardet). This is a big
             # performance boon, and can be removed once requests is upgraded
             # (https://github.com/kennethreitz/requests/pull/814/)
-            r.encoding = chardet.detect(r.content)['encoding']
+            r.encoding = _detect_encoding(r.content)
 
         # Grab the content
         text = self._clean_text(r.text)
         html_tree = html.fromstring(text)
-        html_tree.rewrite_links(self._link_repl)
+        if not self.lazy_links:
+            html_tree.rewrite_links(self._link_repl)
         return html_tree
 
     def _download_backwards(self):
@@ -1,3 +1,6 @@
+import threading
+import time
+
 from juriscraper.AbstractSite import logger
 
 
@@ -5,14 +8,33 @@ class DeferringList(object):
     """This object can be used to do deferred loading of meta data in the case
     that a piece of meta data requires some special work to obtain.
 
-    Note that since this inherits from object (rather than list), it won't be
-    sorted by the _date_sort function. As a result, it's vital that the code
-    using this object provide the seed data in sorted order. Failure to do so
-    will result in mixed up data being sent to the caller -- a bad fate.
+    The parse() method of a Site cleans and sorts a DeferringList without
+    fetching it: cleaning is put off until each value is fetched (see apply),
+    and sorting reorders the seeds along with everything else (see permute).
+    Values are only fetched when they are requested.
+
+    By default, items are fetched one at a time, as they are requested. If the
+    max_workers argument is greater than one, the first request for an item
+    also starts fetching the items after it on a pool of up to max_workers
+    threads, so that later requests find their values already waiting. The
+    window argument limits how far ahead of the requested item this goes (by
+    default, all remaining items are prefetched). Values always stay in the
+    order of their seeds.
+
+    If the error_value argument is provided, an item whose fetcher raises an
+    exception is given that value instead, and the exception is recorded in
+    the errors attribute, keyed by index. Otherwise, the exception is raised
+    when the item is requested, as usual.
+
+    The time taken by each call to the fetcher is recorded in the fetch_times
+    attribute. parse() calls record_stats() so that every fetch, including
+    those made after it returns, is also added to the Site's stats.
 
     For an example of how this can be used, see
     juriscraper.opinions.united_states.state.tex
     """
+    _raise = object()
+
     def __init__(self, *args, **kwargs):
         logger.warn("Using DeferringList object which cannot be sorted until "
                     "fetched. Note that in usual processing, the fetching "
@@ -22,6 +44,20 @@ class DeferringList(object):
         self._data = kwargs['seed']
         self._fetched_items = [False] * len(kwargs['seed'])
         self._fetching_function = kwargs['fetcher']
+        self._max_workers = kwargs.get('max_workers', 1)
+        self._window = kwargs.get('window')
+        self._error_value = kwargs.get('error_value', self._raise)
+        self.errors = {}
+        self.fetch_times = []
+        self.stats = None
+        self._functions = []
+
+        # State for prefetching. All of it is guarded by self._condition.
+        self._condition = threading.Condition()
+        self._queue = []
+        self._in_flight = set()
+        self._num_workers = 0
+        self._prefetched_to = 0
 
     def __iter__(self):
         for item in range(0, len(self._data)):
@@ -31,15 +67,152 @@ class DeferringList(object):
                 yield self.__getitem__(item)
 
     def __getitem__(self, item):
-        if self._fetched_items[item]:
-            return self._data[item]
-        else:
-            # Go get the item using the fetching function
-            logger.info("Getting deferred value from seed: %s" % self._data[item])
+        if isinstance(item, slice):
+            return [self.__getitem__(i)
+                    for i in xrange(*item.indices(len(self._data)))]
+        if item < 0:
+            item += len(self._data)
+        with self._condition:
+            # Wait for a worker if it's already fetching this item.
+            while item in self._in_flight:
+                self._condition.wait()
+            needs_fetch = not self._fetched_items[item]
+            if needs_fetch:
+                if item in self._queue:
+                    self._queue.remove(item)
+                self._in_flight.add(item)
+            else:
+                new_val = self._data[item]
+
+        try:
+            if needs_fetch:
+                new_val = self._fetch(item)
+        finally:
+            self._prefetch(item + 1)
+        return new_val
+
+    def _fetch(self, item):
+        """Go get the item using the fetching function. The caller must have
+        marked the item as in flight.
+        """
+        logger.info("Getting deferred value from seed: %s" % self._data[item])
+        start = time.time()
+        try:
             new_val = self._fetching_function(self._data[item])
+        except Exception, e:
+            with self._condition:
+                self._record_fetch(time.time() - start)
+                self._in_flight.discard(item)
+                self.errors[item] = e
+                new_val = self._error_value
+                if new_val is not self._raise:
+                    logger.warning("Unable to get deferred value from seed: "
+                                   "%s (%s)" % (self._data[item], e))
+                    new_val = self._apply_functions(new_val)
+                    self._data[item] = new_val
+                    self._fetched_items[item] = True
+                self._condition.notify_all()
+            if new_val is self._raise:
+                raise
+            return new_val
+
+        with self._condition:
+            self._record_fetch(time.time() - start)
+            self._in_flight.discard(item)
+            self.errors.pop(item, None)
+            new_val = self._apply_functions(new_val)
             self._data[item] = new_val
             self._fetched_items[item] = True
-            return new_val
+            self._condition.notify_all()
+        return new_val
+
+    def _record_fetch(self, seconds):
+        """The caller must hold self._condition."""
+        self.fetch_times.append(seconds)
+        if self.stats is not None:
+            self.stats.add_deferred_fetch(seconds)
+
+    def record_stats(self, stats):
+        """Adds the fetches made so far to a SiteStats object, and every
+        later fetch as it happens.
+        """
+        with self._condition:
+            for seconds in self.fetch_times:
+                stats.add_deferred_fetch(seconds)
+            self.stats = stats
+
+    def _apply_functions(self, value):
+        for func in self._functions:
+            value = func(value)
+        return value
+
+    def apply(self, func):
+        """Applies func to every value: now to the values already fetched, and
+        to the rest as they are fetched. This lets values be cleaned up
+        without fetching them all.
+        """
+        with self._condition:
+            while self._in_flight:
+                self._condition.wait()
+            self._functions.append(func)
+            for i, fetched in enumerate(self._fetched_items):
+                if fetched:
+                    self._data[i] = func(self._data[i])
+
+    def permute(self, order):
+        """Reorders the list without fetching anything, so that item i is the
+        item that was at index order[i]. Items left out of order are dropped.
+        """
+        with self._condition:
+            # Reordering changes the indexes, so stop prefetching first.
+            self._queue = []
+            self._prefetched_to = 0
+            while self._in_flight:
+                self._condition.wait()
+            self._data = [self._data[i] for i in order]
+            self._fetched_items = [self._fetched_items[i] for i in order]
+            new_indexes = dict((old, new) for new, old in enumerate(order))
+            self.errors = dict((new_indexes[i], e)
+                               for i, e in self.errors.items()
+                               if i in new_indexes)
+
+    def _prefetch(self, start):
+        """Queue up unfetched items from start onwards and make sure there are
+        workers to fetch them.
+        """
+        if self._max_workers < 2:
+            return
+        if self._window is None:
+            end = len(self._data)
+        else:
+            end = min(len(self._data), start + self._window)
+        with self._condition:
+            # Items before the high-water mark have already been queued once.
+            # If they failed, they're retried when they're requested.
+            for i in range(max(start, self._prefetched_to), end):
+                if not (self._fetched_items[i] or i in self._in_flight):
+                    self._queue.append(i)
+            self._prefetched_to = max(end, self._prefetched_to)
+            while self._num_workers < min(self._max_workers, len(self._queue)):
+                self._num_workers += 1
+                t = threading.Thread(target=self._work)
+                t.daemon = True
+                t.start()
+
+    def _work(self):
+        while True:
+            with self._condition:
+                if not self._queue:
+                    self._num_workers -= 1
+                    return
+                item = self._queue.pop(0)
+                self._in_flight.add(item)
+            try:
+                self._fetch(item)
+            except Exception:
+                # Recorded in self.errors, and raised again if the item is
+                # requested.
+                pass
 
     def __setitem__(self, key, value):
         if self._fetched_items[key]:
@@ -48,15 +221,26 @@ class DeferringList(object):
             raise AttributeError('Cannot set item that has not yet been fetched.')
 
     def __delitem__(self, item):
-        del self._data[item]
-        del self._fetched_items[item]
+        with self._condition:
+            # Deleting shifts the indexes, so stop prefetching first.
+            self._queue = []
+            self._prefetched_to = 0
+            while self._in_flight:
+                self._condition.wait()
+            if item < 0:
+                item += len(self._data)
+            del self._data[item]
+            del self._fetched_items[item]
+            errors = {}
+            for i, e in self.errors.items():
+                if i < item:
+                    errors[i] = e
+                elif i > item:
+                    errors[i - 1] = e
+            self.errors = errors
 
     def __len__(self):
         return len(self._data)
 
     def __str__(self):
         return "<DeferringList %s>" % self.__dict__
-
-
-
-
@@ -0,0 +1,376 @@
+"""Benchmarks every scraper against its example files.
+
+Each court is parsed in LOCAL mode several times, in its own process so that
+its peak memory can be measured, and the results are printed as a table. The
+results can be saved as a JSON baseline, and later runs can be compared
+against it to catch scrapers that have become much slower.
+"""
+import glob
+import json
+import logging
+import os
+import re
+import resource
+import subprocess
+import sys
+import time
+import traceback
+from multiprocessing import Process, Queue
+from Queue import Empty
+from optparse import OptionParser
+
+from juriscraper.AbstractSite import AbstractSite
+from juriscraper.tests import MockRequest
+from lib.importer import build_module_list
+
+try:
+    import cchardet as chardet
+except ImportError:
+    import chardet
+
+
+# How long to wait for a court's benchmark before checking that its process
+# is still alive.
+POLL_INTERVAL = 1
+
+
+class NoExamplesException(Exception):
+    def __init__(self, message):
+        Exception.__init__(self, message)
+
+
+def get_example_paths(module_string):
+    """Returns the example files of a court, which sit next to its module.
+    They're found from the module's file, so it doesn't matter whether
+    module_string starts with juriscraper. or where we're run from.
+    """
+    package, module = module_string.rsplit('.', 1)
+    mod = __import__(module_string, globals(), locals(), [module])
+    base = os.path.splitext(os.path.abspath(mod.__file__))[0]
+    paths = [path for path in glob.glob('%s_example*' % base)
+             if not path.endswith('~')]
+    if not paths:
+        raise NoExamplesException("No example file found for: %s!" %
+                                  module_string)
+    return paths
+
+
+def benchmark_court(module_string, runs):
+    """Parses every example file of a court runs times, returning a dict of
+    the results.
+
+    Times are in seconds, and are for parsing all of the court's example
+    files once. stages has the mean time per run of each stage of parse()
+    (see lib.stats_utils).
+    """
+    package, module = module_string.rsplit('.', 1)
+    mod = __import__(module_string, globals(), locals(), [module])
+    paths = get_example_paths(module_string)
+
+    times = []
+    stages = {}
+    items = 0
+    for _ in range(runs):
+        items = 0
+        t1 = time.time()
+        for path in paths:
+            site = mod.Site()
+            site.url = path
+            site.method = 'LOCAL'
+            site.parse()
+            items += len(site.case_names)
+            for stage, seconds in site.stats.times.items():
+                stages[stage] = stages.get(stage, 0) + seconds
+        times.append(time.time() - t1)
+
+    num_bytes = sum(os.path.getsize(path) for path in paths)
+    best = min(times)
+    return {
+        'example_files': len(paths),
+        'items': items,
+        'bytes': num_bytes,
+        'best_time': best,
+        'mean_time': sum(times) / len(times),
+        'items_per_second': items / best if best else None,
+        'mb_per_second': num_bytes / 1024.0 / 1024 / best if best else None,
+        'stages': dict((stage, seconds / runs)
+                       for stage, seconds in stages.items()),
+        # In kilobytes on Linux.
+        'peak_memory': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def _benchmark_in_child(module_string, runs, results):
+    logging.disable(logging.CRITICAL)
+    try:
+        results.put((benchmark_court(module_string, runs), None))
+    except Exception:
+        results.put((None, traceback.format_exc()))
+
+
+def run_benchmarks(module_strings, runs):
+    """Benchmarks each court in a process of its own, yielding
+    (module_string, result, error) tuples.
+    """
+    for module_string in module_strings:
+        results = Queue()
+        p = Process(target=_benchmark_in_child,
+                    args=(module_string, runs, results))
+        p.start()
+        while True:
+            try:
+                result, error = results.get(timeout=POLL_INTERVAL)
+                break
+            except Empty:
+                if not p.is_alive():
+                    # It may have put its result just before exiting.
+                    try:
+                        result, error = results.get(timeout=POLL_INTERVAL)
+                    except Empty:
+                        result = None
+                        error = ('The benchmark process died with exit code '
+                                 '%s.' % p.exitcode)
+                    break
+        p.join()
+        yield module_string, result, error
+
+
+def find_regressions(baseline, results, threshold, min_time):
+    """Compares results to a baseline, returning a list of
+    (module_string, old_time, new_time) for every court whose best time
+    grew by more than threshold times. Courts that took less than min_time
+    seconds in both are ignored, since their timings are mostly noise.
+    """
+    regressions = []
+    for module_string, result in sorted(results.items()):
+        old = baseline.get(module_string)
+        if old is None:
+            continue
+        old_time, new_time = old['best_time'], result['best_time']
+        if max(old_time, new_time) < min_time:
+            continue
+        if new_time > old_time * threshold:
+            regressions.append((module_string, old_time, new_time))
+    return regressions
+
+
+def _chained_clean_text(text):
+    """The original AbstractSite._clean_text, which made a full regex pass
+    over the page for each fix. Kept as the baseline for
+    benchmark_clean_text.
+    """
+    text = re.sub(r'<!\[CDATA\[', '', text)
+    text = re.sub(r'\]\]>', '', text)
+    if isinstance(text, unicode):
+        text = re.sub(r'^\s*<\?xml\s+.*?\?>', '', text)
+    text = re.sub('</br>', '<br/>', text)
+    text = re.sub(u'[^\u0020-\uD7FF\u0009\u000A\u000D\uE000-\uFFFD\u10000-\u10FFFF]+', '', text)
+    return text
+
+
+def benchmark_clean_text(paths, runs):
+    """Times AbstractSite._clean_text against the original implementation
+    on the given files, decoded as _download would. Returns the best old and
+    new times for all of the files together, and the paths of any files for
+    which the two give different results.
+    """
+    texts = []
+    for path in paths:
+        r = MockRequest(url=path).get()
+        r.encoding = chardet.detect(r.content)['encoding']
+        if r.encoding == 'ISO-8859-1':
+            r.encoding = 'cp1252'
+        texts.append(r.text)
+
+    clean_text = AbstractSite()._clean_text
+    mismatches = [path for path, text in zip(paths, texts)
+                  if clean_text(text) != _chained_clean_text(text)]
+    best = {}
+    for name, f in (('old', _chained_clean_text), ('new', clean_text)):
+        times = []
+        for _ in range(runs):
+            t1 = time.time()
+            for text in texts:
+                f(text)
+            times.append(time.time() - t1)
+        best[name] = min(times)
+    return best['old'], best['new'], mismatches
+
+
+# Run in a fresh interpreter to time the import of a module, printing the
+# seconds it took, the number of modules loaded and which of the slow optional
+# dependencies came along with it.
+IMPORT_TIMER = """
+import sys, time
+t1 = time.time()
+import %s
+seconds = time.time() - t1
+heavy = [name for name in ('requests', 'chardet', 'cchardet', 'dateutil',
+                           'selenium', 'logging.handlers')
+         if name in sys.modules]
+print seconds, len(sys.modules), ','.join(heavy) or '-'
+"""
+
+BASE_MODULES = [
+    'juriscraper.AbstractSite',
+    'juriscraper.OpinionSite',
+    'juriscraper.OralArgumentSite',
+]
+
+
+def benchmark_import_time(module_string, runs):
+    """Imports a module in a new interpreter runs times, returning the best
+    time in seconds, the number of modules loaded and the slow dependencies
+    that were loaded.
+    """
+    # Give the child our path, so that it finds the same modules.
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    times = []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, '-c', IMPORT_TIMER % module_string], env=env)
+        seconds, num_modules, heavy = output.split()
+        times.append(float(seconds))
+    return min(times), int(num_modules), heavy
+
+
+def main():
+    usage = ('usage: %prog [-c COURTID] [-n RUNS] [--save PATH] '
+             '[--compare PATH] [--clean-text] [--import-time]\n\n'
+             'To benchmark every scraper and save the results as a '
+             'baseline, use:\n'
+             '    python benchmark.py --save baseline.json\n'
+             'To check for regressions against that baseline, use:\n'
+             '    python benchmark.py --compare baseline.json')
+    parser = OptionParser(usage)
+    parser.add_option('-c', '--courts', dest='court_id', metavar='COURTID',
+                      default='juriscraper',
+                      help='The court(s) to benchmark, as a package or '
+                           'module (default: all of them).')
+    parser.add_option('-n', '--runs', dest='runs', type='int', default=5,
+                      help='The number of times to parse each court '
+                           '(default: 5).')
+    parser.add_option('-s', '--stages', dest='stages', action='store_true',
+                      default=False,
+                      help='Show the slowest stages of parse() for each '
+                           'court.')
+    parser.add_option('--clean-text', dest='clean_text', action='store_true',
+                      default=False,
+                      help='Instead of benchmarking the courts, compare the '
+                           'speed and output of _clean_text with its '
+                           'original implementation on their example files.')
+    parser.add_option('--import-time', dest='import_time',
+                      action='store_true', default=False,
+                      help='Instead of benchmarking the courts, time how long '
+                           'a new process takes to import the base classes '
+                           'and each court.')
+    parser.add_option('--save', dest='save', metavar='PATH', default=None,
+                      help='Save the results as JSON to this file.')
+    parser.add_option('--compare', dest='compare', metavar='PATH',
+                      default=None,
+                      help='Compare the results to a baseline saved with '
+                           '--save, exiting with an error if any court has '
+                           'regressed.')
+    parser.add_option('--threshold', dest='threshold', type='float',
+                      default=1.5,
+                      help='With --compare, how many times slower a court '
+                           'must be to count as a regression (default: 1.5).')
+    parser.add_option('--min-time', dest='min_time', type='float',
+                      default=0.01,
+                      help='With --compare, ignore courts that take less '
+                           'than this many seconds (default: 0.01).')
+    (options, args) = parser.parse_args()
+
+    court_id = options.court_id.replace('/', '.')
+    if court_id.endswith('.py'):
+        court_id = court_id[:-3]
+    module_strings = [m for m in build_module_list(court_id)
+                      if 'backscraper' not in m]
+    if not module_strings:
+        parser.error('Unable to import module or package. Aborting.')
+
+    if options.clean_text:
+        try:
+            paths = [path for m in module_strings
+                     for path in get_example_paths(m)]
+        except NoExamplesException, e:
+            parser.error(str(e))
+        old_time, new_time, mismatches = benchmark_clean_text(paths,
+                                                              options.runs)
+        num_bytes = sum(os.path.getsize(path) for path in paths)
+        print 'Cleaned %s example files (%0.1f MB):' % (
+            len(paths), num_bytes / 1024.0 / 1024)
+        print '    Original: %0.3fs' % old_time
+        print '    Current:  %0.3fs (%0.1fx)' % (new_time, old_time / new_time)
+        for path in mismatches:
+            print 'MISMATCH: %s' % path
+        sys.exit(1 if mismatches else 0)
+
+    if options.import_time:
+        modules = BASE_MODULES + module_strings
+        width = max(len(m) for m in modules) + 2
+        print '%s %9s %8s  %s' % ('Module'.ljust(width), 'Best (ms)',
+                                  'Modules', 'Slow imports')
+        for module_string in modules:
+            seconds, num_modules, heavy = benchmark_import_time(module_string,
+                                                                options.runs)
+            print '%s %9.1f %8d  %s' % (module_string.ljust(width),
+                                        seconds * 1000, num_modules, heavy)
+        sys.exit(0)
+
+    width = max(len(m) for m in module_strings) + 2
+    print '%s %8s %8s %10s %8s %10s' % (
+        'Court'.ljust(width), 'Items', 'Best (s)', 'Items/s', 'MB/s',
+        'Peak (MB)')
+    results = {}
+    failed = False
+    for module_string, result, error in run_benchmarks(module_strings,
+                                                       options.runs):
+        if error:
+            failed = True
+            print '%s FAILED' % module_string.ljust(width)
+            print error
+            continue
+        results[module_string] = result
+        print '%s %8d %8.3f %10.0f %8.2f %10.1f' % (
+            module_string.ljust(width),
+            result['items'],
+            result['best_time'],
+            result['items_per_second'] or 0,
+            result['mb_per_second'] or 0,
+            result['peak_memory'] / 1024.0,
+        )
+        if options.stages:
+            stages = sorted(result['stages'].items(),
+                            key=lambda item: -item[1])
+            for stage, seconds in stages[:5]:
+                print '    %s %0.4fs' % (stage.ljust(30), seconds)
+
+    total = sum(result['best_time'] for result in results.values())
+    print '\n%s courts benchmarked in %0.2f seconds per run.' % (
+        len(results), total)
+
+    if options.save:
+        with open(options.save, 'w') as f:
+            json.dump({'runs': options.runs, 'courts': results}, f,
+                      indent=2, sort_keys=True)
+        print 'Saved results to: %s' % options.save
+
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)['courts']
+        regressions = find_regressions(baseline, results, options.threshold,
+                                       options.min_time)
+        for module_string, old_time, new_time in regressions:
+            print 'REGRESSION: %s went from %0.3fs to %0.3fs (%0.1fx)' % (
+                module_string, old_time, new_time, new_time / old_time)
+        if regressions:
+            failed = True
+        else:
+            print 'No regressions found against: %s' % options.compare
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""Runs back-scrapes that can be stopped and picked up again later.
+
+Loading the historical corpus of a court means calling _download_backwards()
+with every item of its back_scrape_iterable, which can take days. The
+back_scrape() generator in this module does that work on a few threads at a
+time, retries items that fail, and records each item once it is finished in
+a BackScrapeState file, so that a run that crashes or is killed can resume
+where it left off instead of starting over.
+
+Given a set of items already seen (usually a lib.cache_utils.SeenCache),
+back_scrape() can also catch up incrementally: it stops at the first page
+with nothing new, so a nightly run over a paginated court fetches a page or
+two instead of the whole archive.
+"""
+import json
+import os
+import threading
+import time
+import traceback
+from Queue import Queue, Empty
+
+from juriscraper.AbstractSite import logger
+from juriscraper.lib.cache_utils import SeenCache
+
+
+class BackScrapeState(object):
+    """Keeps track of which back_scrape_iterable items of each court are
+    finished, in a JSON file.
+
+    Items are identified by their repr(), so the iterable must produce items
+    with a stable repr (ints, strings, dates, tuples of these, etc.). Items
+    that ran out of retries are recorded along with their last error, and are
+    tried again on the next run.
+
+    Rewriting the whole file for every item would make a long back-scrape
+    quadratic, so each change is instead appended as a line of JSON to a
+    journal next to it (path + '.journal'), which is replayed when the state
+    is loaded. Once the journal has grown as long as the state itself, the
+    file is rewritten and the journal emptied. The file is always written to
+    a temporary file and moved into place, so a crash can't corrupt it; at
+    worst, the journal's last line is cut short and that one change is lost.
+    """
+    # The journal is never compacted while it's shorter than this.
+    min_journal_size = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = '%s.journal' % path
+        self._lock = threading.Lock()
+        self._courts = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for module_string, court in json.load(f).items():
+                    self._courts[module_string] = {
+                        'done': set(court['done']),
+                        'failed': court['failed'],
+                    }
+        self._journal_size = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash.
+                        continue
+                    self._apply(*entry)
+                    self._journal_size += 1
+        self._journal = None
+
+    def _court(self, module_string):
+        return self._courts.setdefault(module_string,
+                                       {'done': set(), 'failed': {}})
+
+    def _apply(self, action, module_string, item_repr, error=None):
+        court = self._court(module_string)
+        if action == 'done':
+            court['done'].add(item_repr)
+            court['failed'].pop(item_repr, None)
+        else:
+            court['failed'][item_repr] = error
+
+    def _record(self, *entry):
+        """Applies a change and appends it to the journal. The caller must
+        hold the lock.
+        """
+        self._apply(*entry)
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a+')
+            self._journal.seek(0, os.SEEK_END)
+            if self._journal.tell():
+                self._journal.seek(-1, os.SEEK_END)
+                if self._journal.read(1) != '\n':
+                    # End the line a crash cut short, so it doesn't swallow
+                    # the next one.
+                    self._journal.write('\n')
+        self._journal.write(json.dumps(entry) + '\n')
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._journal_size += 1
+        size = sum(len(court['done']) + len(court['failed'])
+                   for court in self._courts.values())
+        if self._journal_size >= max(self.min_journal_size, size):
+            self._save()
+
+    def is_done(self, module_string, item):
+        with self._lock:
+            return repr(item) in self._court(module_string)['done']
+
+    def mark_done(self, module_string, item):
+        with self._lock:
+            self._record('done', module_string, repr(item))
+
+    def mark_failed(self, module_string, item, error):
+        with self._lock:
+            self._record('failed', module_string, repr(item), error)
+
+    def failed(self, module_string):
+        """Returns a dict of the items that failed, and their errors."""
+        with self._lock:
+            return dict(self._court(module_string)['failed'])
+
+    def close(self):
+        """Writes out the whole state and empties the journal."""
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        # Write to a temporary file and move it into place, so that a crash
+        # mid-write doesn't lose the whole file. Only then is the journal
+        # emptied; replaying it over the new file would change nothing.
+        courts = dict((module_string, {'done': sorted(court['done']),
+                                       'failed': court['failed']})
+                      for module_string, court in self._courts.items())
+        tmp_path = '%s.tmp' % self.path
+        with open(tmp_path, 'w') as f:
+            json.dump(courts, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.rename(tmp_path, self.path)
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._journal_size = 0
+
+
+def _run_item(mod, item, results, retries, backoff, setup):
+    """Downloads and parses the Site for a single item, putting the outcome
+    onto the results queue.
+    """
+    for attempt in range(retries + 1):
+        site = None
+        try:
+            site = mod.Site()
+            if setup is not None:
+                setup(site)
+            site._download_backwards(item)
+            site.parse()
+            results.put((item, site, None))
+            return
+        except Exception:
+            error = traceback.format_exc()
+            if attempt < retries:
+                wait = backoff * 2 ** attempt
+                logger.warning("Back-scrape of %s failed, retrying in %s "
+                               "seconds:\n%s" % (item, wait, error))
+                time.sleep(wait)
+    results.put((item, site, error))
+
+
+def _has_new_items(site, seen):
+    """Returns whether any item of a parsed Site is missing from seen."""
+    keys = set(SeenCache.item_keys(site))
+    if hasattr(seen, 'seen_keys'):
+        known = seen.seen_keys(keys)
+    else:
+        known = set(key for key in keys if key in seen)
+    return len(known) < len(keys)
+
+
+def back_scrape(module_string, state=None, max_workers=1, retries=3,
+                backoff=10, setup=None, seen=None):
+    """Back-scrapes a court, yielding a parsed Site for each item of its
+    back_scrape_iterable as it completes.
+
+    :param module_string: The court to back-scrape, as returned by
+    lib.importer.build_module_list.
+    :param state: If provided, a BackScrapeState. Items it lists as done are
+    skipped, and each item is marked done once the caller has finished with
+    its Site (i.e., when the generator is resumed after yielding it).
+    :param max_workers: The number of items to download at once. The iterable
+    is consumed lazily, so endless iterables (e.g., pagers) are fine.
+    :param retries: How many times to retry an item that fails.
+    :param backoff: The number of seconds to wait before the first retry. The
+    wait doubles for every retry after that.
+    :param setup: If provided, a function that is called with every Site
+    before it is downloaded, e.g. to give it a cache.
+    :param seen: If provided, a SeenCache, or any container of the keys made
+    by SeenCache.item_key(), holding the items already handled. No more items
+    are taken from the iterable once a page comes back with nothing that
+    isn't in it (including a page with nothing at all); items already
+    started still finish. This only makes sense for iterables that go from
+    newest to oldest, and usually without a state, whose finished items
+    would otherwise be skipped.
+
+    Yields tuples of (item, site, error). If the item was scraped
+    successfully, error is None; otherwise it is the formatted traceback of
+    the last failure.
+    """
+    package, module = module_string.rsplit('.', 1)
+    mod = __import__(module_string, globals(), locals(), [module])
+    items = iter(mod.Site().back_scrape_iterable)
+    results = Queue()
+    running = 0
+    exhausted = False
+
+    while True:
+        while not exhausted and running < max_workers:
+            try:
+                item = next(items)
+            except StopIteration:
+                exhausted = True
+                break
+            if state is not None and state.is_done(module_string, item):
+                logger.info("Skipping finished back-scrape item: %s" % item)
+                continue
+            logger.info("Back-scraping %s with item: %s" % (module_string,
+                                                           item))
+            t = threading.Thread(target=_run_item,
+                                 args=(mod, item, results, retries, backoff,
+                                       setup))
+            t.daemon = True
+            t.start()
+            running += 1
+
+        if not running:
+            break
+
+        try:
+            # Time out now and then so that KeyboardInterrupt gets through.
+            item, site, error = results.get(timeout=1)
+        except Empty:
+            continue
+        running -= 1
+
+        if (seen is not None and not error and not exhausted and
+                not _has_new_items(site, seen)):
+            logger.info("Nothing new for %s at item %s. Stopping the "
+                        "back-scrape." % (module_string, item))
+            exhausted = True
+
+        if error and state is not None:
+            state.mark_failed(module_string, item, error)
+        yield item, site, error
+        if not error and state is not None:
+            state.mark_done(module_string, item)
@@ -0,0 +1,196 @@
+"""A pool of headless browsers shared by the scrapers that need one.
+
+A few courts can only be scraped by driving a real browser with Selenium.
+Starting PhantomJS takes seconds and a good deal of memory, so rather than
+launching one per download, these scrapers lease a browser from the pool with
+browser_for() and hand it back when they are done. Idle browsers are kept
+warm for the next lease, up to max_instances browsers are ever running at
+once, and each browser is replaced after max_uses leases, or as soon as it
+stops responding.
+"""
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from juriscraper.AbstractSite import logger
+from juriscraper.lib.cookie_utils import normalize_cookies
+
+PHANTOMJS_PATH = '/usr/local/phantomjs/phantomjs'
+
+
+class BrowserPoolTimeoutException(Exception):
+    def __init__(self, message):
+        Exception.__init__(self, message)
+
+
+def _start_phantomjs():
+    # Imported here so that Selenium is only needed by courts that use it.
+    from selenium import webdriver
+    logger.info("Starting Selenium browser PhantomJS...")
+    return webdriver.PhantomJS(
+        executable_path=PHANTOMJS_PATH,
+        service_log_path=os.path.devnull,  # Disable ghostdriver.log
+    )
+
+
+class BrowserPool(object):
+    """Hands out Selenium browsers, reusing them between leases.
+
+    :param max_instances: The most browsers that may be running at once.
+    :param max_uses: How many leases a browser serves before it is quit and
+    replaced, so that leaks in the browser don't build up.
+    :param timeout: How many seconds lease() waits for a browser to become
+    free before raising a BrowserPoolTimeoutException.
+    :param page_load_timeout: How many seconds a leased browser may spend
+    loading any one page.
+    :param factory: A function that starts a new browser. Defaults to
+    starting PhantomJS.
+    """
+    def __init__(self, max_instances=2, max_uses=50, timeout=300,
+                 page_load_timeout=120, factory=_start_phantomjs):
+        self.max_instances = max_instances
+        self.max_uses = max_uses
+        self.timeout = timeout
+        self.page_load_timeout = page_load_timeout
+        self.factory = factory
+        self._condition = threading.Condition()
+        # Idle browsers, as [driver, uses] pairs.
+        self._idle = []
+        self._num_instances = 0
+
+    def _start(self):
+        driver = self.factory()
+        driver.set_page_load_timeout(self.page_load_timeout)
+        return driver
+
+    def warm_up(self, count=1):
+        """Starts browsers ahead of time, so that the first leases don't have
+        to wait for them.
+        """
+        for _ in range(count):
+            with self._condition:
+                if self._num_instances >= self.max_instances:
+                    return
+                self._num_instances += 1
+            try:
+                driver = self._start()
+            except Exception:
+                with self._condition:
+                    self._num_instances -= 1
+                    self._condition.notify()
+                raise
+            with self._condition:
+                self._idle.append([driver, 0])
+                self._condition.notify()
+
+    def _acquire(self):
+        deadline = time.time() + self.timeout
+        with self._condition:
+            while not self._idle and \
+                    self._num_instances >= self.max_instances:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise BrowserPoolTimeoutException(
+                        "No browser became free within %s seconds." %
+                        self.timeout)
+                self._condition.wait(remaining)
+            if self._idle:
+                return self._idle.pop()
+            self._num_instances += 1
+        try:
+            return [self._start(), 0]
+        except Exception:
+            with self._condition:
+                self._num_instances -= 1
+                self._condition.notify()
+            raise
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._condition:
+            self._num_instances -= 1
+            self._condition.notify()
+
+    def _release(self, entry):
+        driver, uses = entry
+        entry[1] = uses = uses + 1
+        if uses >= self.max_uses:
+            logger.info("Recycling browser after %s uses." % uses)
+            self._quit(driver)
+            return
+        try:
+            # Clear out whatever the last lease left behind. This also checks
+            # that the browser still works, in case it crashed.
+            driver.delete_all_cookies()
+            driver.implicitly_wait(0)
+            driver.get('about:blank')
+        except Exception:
+            logger.warning("Recycling browser that stopped responding.")
+            self._quit(driver)
+            return
+        with self._condition:
+            self._idle.append(entry)
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self):
+        """Leases a browser for the body of a with statement. Don't close or
+        quit the browser; it goes back to the pool afterwards.
+        """
+        entry = self._acquire()
+        try:
+            yield entry[0]
+        finally:
+            self._release(entry)
+
+    def close(self):
+        """Quits every idle browser. Leased browsers are quit as they are
+        handed back.
+        """
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self.max_uses = 0
+        for driver, uses in idle:
+            self._quit(driver)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Returns the shared BrowserPool, creating it if necessary."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+        return _pool
+
+
+def configure_browser_pool(**kwargs):
+    """Replaces the shared BrowserPool with one made with the given keyword
+    arguments (see BrowserPool), closing the old one.
+    """
+    global _pool
+    with _pool_lock:
+        old_pool, _pool = _pool, BrowserPool(**kwargs)
+        atexit.register(_pool.close)
+    if old_pool is not None:
+        old_pool.close()
+
+
+@contextmanager
+def browser_for(site):
+    """Leases a browser from the shared pool for a Site. Afterwards, the
+    cookies the browser picked up are added to site.cookies, so that the
+    Site's later requests (including binary downloads) are made with them.
+    """
+    with get_browser_pool().lease() as driver:
+        yield driver
+        site.cookies.update(normalize_cookies(driver.get_cookies()))
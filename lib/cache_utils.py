@@ -0,0 +1,331 @@
+"""Local, persistent caches that let Juriscraper skip work it has already
+done.
+
+These are all opt-in and are stored in SQLite databases, so they survive
+between runs and can be shared by the threads of a single process.
+"""
+import hashlib
+import json
+import math
+import sqlite3
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+
+class SqliteCache(object):
+    """Base class for the caches below, which each keep a single table in a
+    SQLite database. A new connection is opened for every query, so a cache
+    can be shared between threads.
+    """
+    schema = None
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._execute(self.schema)
+
+    @contextmanager
+    def _connect(self):
+        """Opens a connection for a single transaction, which is committed
+        when the block exits, or rolled back if it raises.
+        """
+        with self._lock:
+            conn = sqlite3.connect(self.path)
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
+
+    def _execute(self, sql, params=()):
+        with self._connect() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def _executemany(self, sql, seq_of_params):
+        with self._connect() as conn:
+            conn.executemany(sql, seq_of_params)
+
+
+class ChangeCache(SqliteCache):
+    """Remembers what each court page looked like the last time it was
+    parsed, so that unchanged pages can be skipped.
+
+    For every page, this stores the ETag and Last-Modified headers the court
+    sent (used to make conditional requests), a digest of the raw body, and the
+    hash of the Site object that was parsed from it.
+
+    To use it, set the change_cache attribute of a Site before calling
+    parse(). If the court answers with a 304 or sends back exactly the same
+    bytes as last time, parse() stops right after downloading, marks the Site
+    as unchanged and gives it the hash it had last time.
+
+    Only the first page a Site downloads is checked, so this is best suited to
+    courts that publish everything on a single page.
+    """
+    schema = ('CREATE TABLE IF NOT EXISTS pages ('
+              'key TEXT PRIMARY KEY, '
+              'etag TEXT, '
+              'last_modified TEXT, '
+              'digest TEXT, '
+              'hash TEXT, '
+              'updated REAL)')
+
+    def get(self, key):
+        """Returns a dict describing the last version of the page, or None if
+        the page has not been seen before.
+        """
+        rows = self._execute('SELECT etag, last_modified, digest, hash '
+                             'FROM pages WHERE key = ?', (key,))
+        if not rows:
+            return None
+        etag, last_modified, digest, hash = rows[0]
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'digest': digest,
+            'hash': hash,
+        }
+
+    def set(self, key, etag, last_modified, digest, hash):
+        self._execute('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)',
+                      (key, etag, last_modified, digest, hash, time.time()))
+
+
+class ResponseCache(SqliteCache):
+    """Keeps successful responses for secondary pages, such as the case detail
+    pages visited by DeferringList fetchers, so that they are not downloaded
+    again on every poll. These pages rarely change once they are published.
+
+    Entries expire after a time to live, given in seconds. Each Site can set
+    its own with its response_cache_ttl attribute; otherwise, the ttl given
+    here is used. Once the cached bodies add up to more than max_size bytes,
+    the least recently used entries are evicted. The total size is read from
+    the database once and then kept up to date as entries come and go, so a
+    cache file should only be used by one ResponseCache at a time.
+
+    To use it, set the response_cache attribute of a Site. Pages downloaded
+    with the Site's _request() method are then cached.
+    """
+    schema = ('CREATE TABLE IF NOT EXISTS responses ('
+              'key TEXT PRIMARY KEY, '
+              'url TEXT, '
+              'status_code INTEGER, '
+              'headers TEXT, '
+              'encoding TEXT, '
+              'content BLOB, '
+              'size INTEGER, '
+              'expires REAL, '
+              'last_used REAL)')
+
+    def __init__(self, path, ttl=7 * 24 * 60 * 60, max_size=500 * 1024 * 1024):
+        super(ResponseCache, self).__init__(path)
+        self._execute('CREATE INDEX IF NOT EXISTS responses_last_used '
+                      'ON responses (last_used)')
+        self.ttl = ttl
+        self.max_size = max_size
+        self._size = self._execute('SELECT SUM(size) FROM responses')[0][0] or 0
+
+    @staticmethod
+    def make_key(method, url, data=None):
+        if isinstance(data, dict):
+            data = sorted(data.items())
+        return '%s %s %s' % (method.upper(), url, data or '')
+
+    def get(self, key):
+        """Returns the cached Response for key, or None if there isn't a
+        fresh one.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute('SELECT url, status_code, headers, encoding, '
+                               'content, size, expires FROM responses '
+                               'WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            url, status_code, headers, encoding, content, size, expires = row
+            if expires < now:
+                conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._size -= size
+                return None
+            conn.execute('UPDATE responses SET last_used = ? WHERE key = ?',
+                         (now, key))
+
+        r = Response()
+        r._content = str(content)
+        r._content_consumed = True
+        r.status_code = status_code
+        r.headers = CaseInsensitiveDict(json.loads(headers))
+        r.encoding = encoding
+        r.url = url
+        return r
+
+    def set(self, key, r, ttl=None):
+        """Caches the Response r under key, then evicts old entries if the
+        cache has grown too big.
+        """
+        now = time.time()
+        if ttl is None:
+            ttl = self.ttl
+        with self._connect() as conn:
+            row = conn.execute('SELECT size FROM responses WHERE key = ?',
+                               (key,)).fetchone()
+            conn.execute('INSERT OR REPLACE INTO responses '
+                         'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                         (key, r.url, r.status_code,
+                          json.dumps(dict(r.headers)), r.encoding,
+                          sqlite3.Binary(r.content), len(r.content),
+                          now + ttl, now))
+            self._size += len(r.content) - (row[0] if row else 0)
+            if self._size > self.max_size:
+                self._evict(conn)
+
+    def _evict(self, conn):
+        """Deletes the least recently used entries until the cache fits in
+        max_size again, as part of the caller's transaction.
+        """
+        excess = self._size - self.max_size
+        evicted = []
+        for key, size in conn.execute('SELECT key, size FROM responses '
+                                      'ORDER BY last_used'):
+            evicted.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany('DELETE FROM responses WHERE key = ?', evicted)
+        self._size = self.max_size + excess
+
+
+class BloomFilter(object):
+    """A set of strings that takes a fixed amount of memory, at the cost of
+    sometimes claiming to contain a string it doesn't. It never misses one
+    that was added.
+
+    It's sized so that, once capacity strings have been added, about
+    error_rate of the lookups for other strings are false positives.
+    """
+    def __init__(self, capacity=1000000, error_rate=0.01):
+        self.num_bits = int(math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, int(round(
+            float(self.num_bits) / capacity * math.log(2))))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, key):
+        # Two hashes from one digest are enough to make all the others
+        # (Kirsch and Mitzenmacher).
+        h1, h2 = struct.unpack('<QQ', hashlib.md5(key).digest())
+        return [(h1 + i * h2) % self.num_bits
+                for i in xrange(self.num_hashes)]
+
+    def add(self, key):
+        positions = self._positions(key)
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(key))
+
+
+class SeenCache(SqliteCache):
+    """Remembers which items and binaries have already been handled, so that
+    each poll of a court only does work for what's new.
+
+    It's used like a set of strings. An item's key, from item_key(), is made
+    from its court, download URL, docket number and date; a binary's key is
+    the SHA1 of its content, so the cache can also be passed as the
+    known_hashes of lib.download_utils.download_binary().
+
+    Every key is also kept in an in-memory Bloom filter, loaded when the cache
+    is opened, so the database is only queried for keys that might be in it.
+    New items, which are the ones that matter, are usually ruled out without
+    touching the disk.
+
+    To use it, set the seen_cache attribute of a Site before calling parse().
+    Items already in the cache are then dropped at the end of parse(), after
+    the Site's hash has been made. Nothing is added by parse(): call
+    add_site() once the items have been saved, so that an item is never
+    marked as seen unless it really was handled.
+    """
+    schema = ('CREATE TABLE IF NOT EXISTS seen ('
+              'key TEXT PRIMARY KEY, '
+              'added REAL)')
+
+    # SQLite allows at most 999 parameters in a query.
+    query_size = 500
+
+    def __init__(self, path, capacity=1000000, error_rate=0.01):
+        super(SeenCache, self).__init__(path)
+        self.bloom = BloomFilter(capacity, error_rate)
+        for key, in self._execute('SELECT key FROM seen'):
+            self.bloom.add(str(key))
+
+    @staticmethod
+    def item_key(court_id, download_url, docket_number, case_date):
+        if case_date is not None:
+            case_date = case_date.isoformat()
+        return 'item:' + hashlib.sha1(json.dumps(
+            [court_id, download_url, docket_number, case_date])).hexdigest()
+
+    @classmethod
+    def item_keys(cls, site):
+        """Returns the key of every item in a parsed Site, in order."""
+        docket_numbers = getattr(site, 'docket_numbers', None)
+        if docket_numbers is None:
+            docket_numbers = [None] * len(site.download_urls)
+        return [cls.item_key(site.court_id, download_url, docket_number,
+                             case_date)
+                for download_url, docket_number, case_date
+                in zip(site.download_urls, docket_numbers, site.case_dates)]
+
+    def __contains__(self, key):
+        return bool(self.seen_keys([key]))
+
+    def seen_keys(self, keys):
+        """Returns the set of keys that are in the cache."""
+        candidates = [key for key in set(keys) if key in self.bloom]
+        seen = set()
+        for i in xrange(0, len(candidates), self.query_size):
+            chunk = candidates[i:i + self.query_size]
+            rows = self._execute(
+                'SELECT key FROM seen WHERE key IN (%s)' %
+                ', '.join('?' * len(chunk)), chunk)
+            seen.update(str(key) for key, in rows)
+        return seen
+
+    def add(self, key):
+        self.update([key])
+
+    def update(self, keys):
+        keys = list(keys)
+        now = time.time()
+        self._executemany('INSERT OR IGNORE INTO seen VALUES (?, ?)',
+                          [(key, now) for key in keys])
+        for key in keys:
+            self.bloom.add(key)
+
+    def filter(self, site):
+        """Drops the items of a parsed Site that are already in the cache,
+        and returns how many were dropped.
+        """
+        keys = self.item_keys(site)
+        seen = self.seen_keys(keys)
+        if seen:
+            site.results.take([i for i, key in enumerate(keys)
+                               if key not in seen])
+        return len(keys) - len(site.download_urls)
+
+    def add_site(self, site, skip=()):
+        """Adds every item of a parsed Site, except those at the indexes in
+        skip (e.g., the ones that failed to download).
+        """
+        self.update(key for i, key in enumerate(self.item_keys(site))
+                    if i not in skip)
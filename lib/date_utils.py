@@ -1,8 +1,6 @@
 # -*- coding: utf-8 -*-
 from math import ceil
 
-from dateutil.parser import _timelex, parser, parserinfo
-
 # We import the entire datetime library because otherwise we run into
 # conflicts in our isinstance statements.
 import datetime
@@ -16,37 +14,73 @@ MISSPELLINGS = {
 }
 
 
-class BetterInfo(parserinfo):
-    """Removes tokens to provide better support for splitting out multiple
-    dates.
+# dateutil is only needed for dates that parse_date() can't handle with
+# strptime, so it isn't imported until then.
+_parser = None
+
+
+def _get_parser():
+    """Returns the dateutil parser used by parse_dates, building it the first
+    time.
+    """
+    global _parser
+    if _parser is None:
+        from dateutil.parser import parser, parserinfo
+
+        class BetterInfo(parserinfo):
+            """Removes tokens to provide better support for splitting out
+            multiple dates.
+
+            By default, the JUMP variable is:
+
+                JUMP = [" ", ".", ",", ";", "-", "/", "'",
+                        "at", "on", "and", "ad", "m", "t", "of",
+                        "st", "nd", "rd", "th"]
+
+            This assumes that a single date is being sent to timesplit, and
+            that that date might contain tokens like "and", ";", or "on". But
+            when you're sending multiple dates, you are more likely to have
+            something like this:
 
-    By default, the JUMP variable is:
+                'February 5, 1980; March 14, 1980 and May 28, 1980.
 
-        JUMP = [" ", ".", ",", ";", "-", "/", "'",
-                "at", "on", "and", "ad", "m", "t", "of",
-                "st", "nd", "rd", "th"]
+            This uses the semicolon and the word "and" to separate dates, so
+            we need to allow them for splitting. This class makes that
+            possible by removing them from the JUMP variable.
+            """
+            # m from a.m/p.m, t from ISO T separator
+            JUMP = [" ", ".", ",", "-", "/", "'",
+                    "ad", "m", "t",
+                    "st", "nd", "rd", "th"]
 
-    This assumes that a single date is being sent to timesplit, and that that
-    date might contain tokens like "and", ";", or "on". But when you're
-    sending multiple dates, you are more likely to have something like this:
+            def __init__(self):
+                super(BetterInfo, self).__init__()
 
-        'February 5, 1980; March 14, 1980 and May 28, 1980.
+        _parser = parser(info=BetterInfo())
+    return _parser
 
-    This uses the semicolon and the word "and" to separate dates, so we need
-    to allow them for splitting. This class makes that possible by removing
-    them from the JUMP variable.
+
+class _LazyAlias(object):
+    """Stands in for a module attribute that is only built when it is first
+    used, forwarding attribute lookups and calls to it.
     """
-    # m from a.m/p.m, t from ISO T separator
-    JUMP = [" ", ".", ",", "-", "/", "'",
-            "ad", "m", "t",
-            "st", "nd", "rd", "th"]
+    def __init__(self, get):
+        self._get = get
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
 
-    def __init__(self):
-        super(BetterInfo, self).__init__()
+    def __call__(self, *args, **kwargs):
+        return self._get()(*args, **kwargs)
 
 
-p = parser(info=BetterInfo())
-info = p.info
+# The parser used to be built when this module was imported. These are kept
+# for code that uses them directly, but they don't import dateutil until then.
+# BetterInfo can be called and its attributes read, but it can't be
+# subclassed or used with isinstance.
+BetterInfo = _LazyAlias(lambda: type(_get_parser().info))
+p = _LazyAlias(_get_parser)
+info = _LazyAlias(lambda: _get_parser().info)
 
 
 def timetoken(token):
@@ -55,12 +89,15 @@ def timetoken(token):
         return True
     except ValueError:
         pass
+    info = _get_parser().info
     return any(f(token) for f in (info.jump, info.weekday, info.month,
                                   info.hms, info.ampm, info.pertain,
                                   info.utczone, info.tzoffset))
 
 
 def timesplit(input_string):
+    from dateutil.parser import _timelex
+    info = _get_parser().info
     batch = []
     for token in _timelex(input_string):
         if timetoken(token):
@@ -112,6 +149,7 @@ def parse_dates(s, debug=False, sane_start=datetime.datetime(1750, 1, 1),
     # Default is set to Christmas, 1600.
     DEFAULT = datetime.datetime(1600, 12, 25)
     dates = []
+    p = _get_parser()
     for item in timesplit(s):
         #print "Found:", item
         try:
@@ -133,6 +171,73 @@ def parse_dates(s, debug=False, sane_start=datetime.datetime(1750, 1, 1),
     return dates
 
 
+# The formats tried by parse_date when none are given, roughly from most to
+# least common among the courts.
+DATE_FORMATS = (
+    '%m/%d/%Y',
+    '%m/%d/%y',
+    '%Y-%m-%d',
+    '%m-%d-%Y',
+    '%B %d, %Y',
+    '%b %d, %Y',
+    '%b. %d, %Y',
+    '%d %B %Y',
+    '%d %b %Y',
+    '%Y/%m/%d',
+)
+
+# The last format that worked, by key.
+_learned_formats = {}
+
+
+def parse_date(s, formats=DATE_FORMATS, key=None, fallback=True):
+    """Parses a single date out of a string, returning a datetime.datetime.
+
+    Each of the strptime formats is tried in turn, and whichever one works is
+    remembered under key (for example, a court and a field), so that the next
+    string with the same key tries it first. Since a court nearly always
+    formats a column of dates the same way, that first try almost always
+    works, and the rest of the formats are rarely needed. Without a key,
+    nothing is remembered, since courts parsing dates at the same time would
+    otherwise keep replacing each other's format.
+
+    If none of the formats work and fallback is True, the date is parsed with
+    parse_dates instead, which is much slower but copes with almost anything.
+
+    Raises a ValueError if no date can be found.
+    """
+    s = ' '.join(s.split())
+    learned = None if key is None else _learned_formats.get(key)
+    if learned is not None:
+        try:
+            return datetime.datetime.strptime(s, learned)
+        except ValueError:
+            pass
+    for date_format in formats:
+        if date_format == learned:
+            continue
+        try:
+            d = datetime.datetime.strptime(s, date_format)
+        except ValueError:
+            continue
+        if key is not None:
+            _learned_formats[key] = date_format
+        return d
+    if fallback:
+        dates = parse_dates(s)
+        if dates:
+            return dates[0]
+    raise ValueError("Unable to parse a date from: %s" % s)
+
+
+def parse_date_column(strings, formats=DATE_FORMATS, key=None,
+                      fallback=True):
+    """Parses a list of strings with parse_date, returning a list of
+    datetime.date objects, as scrapers return from _get_case_dates.
+    """
+    return [parse_date(s, formats, key, fallback).date() for s in strings]
+
+
 def quarter(month):
     """
     :int month: Any month, as an int.
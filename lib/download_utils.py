@@ -0,0 +1,178 @@
+"""Downloads the binary files (PDFs, audio, etc.) that scrapers link to.
+
+Reading a whole file into memory before saving it is fine for a small PDF,
+but oral argument recordings can be hundreds of megabytes. The functions here
+instead stream every file to a temporary file on disk in chunks, computing its
+SHA1 hash along the way, so memory use stays flat no matter how big the file.
+
+Files are downloaded with the shared session for their host (see
+lib.http_utils) and with the cookies of the Site that found them.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import traceback
+from Queue import Queue, Empty
+
+from juriscraper.AbstractSite import AbstractSite, logger
+from juriscraper.lib.http_utils import get_session
+
+CHUNK_SIZE = 64 * 1024
+
+
+class EmptyFileException(Exception):
+    def __init__(self, message):
+        Exception.__init__(self, message)
+
+
+class BinaryDownload(object):
+    """The result of downloading a file.
+
+    path is the temporary file holding the content, or None if the content
+    was already known. The caller is responsible for deleting the file once
+    it is done with it. sha1 is the hex digest of the content, after it has
+    been through the Site's _cleanup_content method.
+    """
+    def __init__(self, url, path, sha1, size):
+        self.url = url
+        self.path = path
+        self.sha1 = sha1
+        self.size = size
+
+    @property
+    def known(self):
+        return self.path is None
+
+    def __repr__(self):
+        return "<BinaryDownload %s (%s bytes, sha1: %s)>" % (
+            self.url, self.size, self.sha1)
+
+
+def _has_cleanup(site):
+    return type(site)._cleanup_content is not AbstractSite._cleanup_content
+
+
+def _clean_file(site, path):
+    """Runs the file at path through the Site's _cleanup_content method,
+    returning the new hash and size.
+
+    Only Sites that override _cleanup_content need this, and those are all
+    cleaning up HTML pages, so reading the file into memory is OK.
+    """
+    with open(path, 'rb') as f:
+        content = site._cleanup_content(f.read())
+    if isinstance(content, unicode):
+        content = content.encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(content)
+    return hashlib.sha1(content).hexdigest(), len(content)
+
+
+def download_binary(site, url, known_hashes=None, directory=None,
+                    chunk_size=CHUNK_SIZE):
+    """Streams the file at url to a temporary file, returning a
+    BinaryDownload.
+
+    :param site: The Site object that found the file. Its cookies are sent
+    along with the request, and its _cleanup_content method is applied.
+    :param known_hashes: If provided, a set or other container of SHA1 hex
+    digests. Files that hash to one of these are deleted as soon as they are
+    downloaded, and the result's path is None. The hash is only known once
+    the whole file has arrived, so this saves disk space but not bandwidth;
+    to avoid downloading a file at all, leave its URL out (for instance, by
+    filtering the Site through a SeenCache first).
+    :param directory: Where to put the temporary file. Defaults to the system
+    temporary directory.
+
+    Raises an EmptyFileException if the server sends back an empty file, and
+    requests' exceptions for bad status codes and connection errors.
+    """
+    logger.info("Now downloading binary at: %s" % url)
+    r = get_session(url).get(url, cookies=site.cookies, stream=True)
+    try:
+        r.raise_for_status()
+        sha1 = hashlib.sha1()
+        size = 0
+        fd, path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in r.iter_content(chunk_size):
+                    sha1.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+            # Test for empty files (thank you CA1)
+            if size == 0:
+                raise EmptyFileException("Empty file at: %s" % url)
+            sha1 = sha1.hexdigest()
+            if _has_cleanup(site):
+                sha1, size = _clean_file(site, path)
+        except:
+            os.remove(path)
+            raise
+    finally:
+        r.close()
+
+    if known_hashes is not None and sha1 in known_hashes:
+        logger.info("Already have binary with hash %s from: %s" % (sha1, url))
+        os.remove(path)
+        path = None
+    return BinaryDownload(url, path, sha1, size)
+
+
+def download_binaries(site, urls, max_workers=4, **kwargs):
+    """Downloads many files at once, using up to max_workers threads.
+
+    Takes the same keyword arguments as download_binary(). Yields tuples of
+    (index, result, error) as each download finishes, where index is the
+    position of the URL in urls. If the download succeeded, result is a
+    BinaryDownload and error is None; otherwise, result is None and error is
+    the formatted traceback of the failure.
+
+    If the generator is closed early, downloads that are already running
+    finish in the background and their files are deleted.
+    """
+    urls = list(urls)
+    todo = Queue()
+    for item in enumerate(urls):
+        todo.put(item)
+    results = Queue()
+    # Guards stopped, so that no result is put on the queue after it has been
+    # cleaned up.
+    lock = threading.Lock()
+    stopped = [False]
+
+    def work():
+        while not stopped[0]:
+            try:
+                index, url = todo.get_nowait()
+            except Empty:
+                return
+            try:
+                result = download_binary(site, url, **kwargs)
+            except Exception:
+                results.put((index, None, traceback.format_exc()))
+                continue
+            with lock:
+                if stopped[0]:
+                    if result.path is not None:
+                        os.remove(result.path)
+                else:
+                    results.put((index, result, None))
+
+    for _ in range(min(max_workers, len(urls))):
+        t = threading.Thread(target=work)
+        t.daemon = True
+        t.start()
+
+    try:
+        for _ in range(len(urls)):
+            yield results.get()
+    finally:
+        with lock:
+            stopped[0] = True
+            # Clean up anything that finished but was never handed back.
+            while not results.empty():
+                index, result, error = results.get()
+                if result is not None and result.path is not None:
+                    os.remove(result.path)
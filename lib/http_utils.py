@@ -0,0 +1,236 @@
+"""A registry of shared HTTP sessions, one per host.
+
+Creating a new requests session for every download throws away the
+underlying connection, so every request pays for a fresh TCP (and often TLS)
+handshake. Instead, everything in Juriscraper that talks to a court should get
+its session from get_session(), which hands back a long-lived session for the
+host of the URL being requested. These sessions keep connections alive in a
+pool and share a single policy for User-Agent, retries and cookies.
+
+Cookies are never stored in the shared sessions, since several Site objects
+for the same host may be using a session at once. Scrapers that need cookies
+must continue to pass them explicitly (usually via self.cookies), and can read
+the cookies a server sets from the response object, as before.
+
+The sessions also keep Juriscraper polite. Every request waits its turn in a
+token bucket for its host, which is shared by every Site in the process, so
+courts that share a host, or a DeferringList fetching in parallel, can't
+flood it. When a host answers with a 429 or a 5xx, or times out, its rate is
+halved and requests to it pause for a while, doubling each time it happens
+again; the rate then creeps back up as requests succeed. Use
+configure_rate_limits() and set_rate_limit() to change the rates.
+"""
+import threading
+import time
+from cookielib import DefaultCookiePolicy
+from urlparse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = 'Juriscraper'
+
+# Settings for the connection pools of new sessions. Use configure_sessions()
+# to change these.
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 10
+MAX_RETRIES = 0
+
+# The requests per second allowed to each host, and the number of requests
+# that may be sent at once after a quiet spell. A rate of 0 turns the limit
+# off, though hosts that push back are still backed off from.
+RATE_LIMIT = 5.0
+BURST = 5
+# The longest pause, in seconds, after a host pushes back.
+MAX_BACKOFF = 300
+
+# Hosts that need a gentler rate than RATE_LIMIT.
+HOST_RATE_LIMITS = {
+    # Kentucky, whose staff are openly hostile to scrapers (see ky.py).
+    '162.114.92.72': 1.0,
+    '162.114.92.78': 1.0,
+}
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+class RateLimiter(object):
+    """A token bucket for a single host, with adaptive backoff.
+
+    Tokens are added at the current rate, up to burst of them, and each
+    request takes one, waiting if there are none. throttled() halves the
+    current rate and pauses the host, and succeeded() gives back a tenth of
+    the full rate.
+    """
+    def __init__(self, rate, burst, max_backoff):
+        self.rate = float(rate)
+        self.current_rate = self.rate
+        self.burst = burst
+        self.max_backoff = max_backoff
+        self.backoff = 0
+        self._tokens = float(burst)
+        self._updated = time.time()
+        self._paused_until = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.time()
+                if self.current_rate:
+                    self._tokens = min(self.burst, self._tokens +
+                                       (now - self._updated) *
+                                       self.current_rate)
+                self._updated = now
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if not self.current_rate:
+                        return
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.current_rate
+            time.sleep(wait)
+
+    def throttled(self, retry_after=None):
+        """Slows down after the host pushed back. retry_after is the number
+        of seconds the host asked us to wait, if it said.
+        """
+        with self._lock:
+            if self.current_rate:
+                self.current_rate = max(self.rate / 64, self.current_rate / 2)
+            first = 1 / self.rate if self.rate else 1.0
+            self.backoff = min(self.max_backoff,
+                               max(first, self.backoff * 2))
+            self._tokens = 0
+            self._paused_until = max(self._paused_until,
+                                     time.time() + self.backoff,
+                                     time.time() + (retry_after or 0))
+
+    def succeeded(self):
+        with self._lock:
+            if self.current_rate:
+                self.current_rate = min(self.rate,
+                                        self.current_rate + self.rate / 10)
+            self.backoff /= 2
+
+
+def _retry_after(r):
+    """Returns the seconds in a Retry-After header, or None. Dates aren't
+    understood.
+    """
+    try:
+        return min(MAX_BACKOFF, max(0, int(r.headers.get('Retry-After'))))
+    except (TypeError, ValueError):
+        return None
+
+
+def get_rate_limiter(url):
+    """Returns the shared RateLimiter for the host of url, creating it if
+    necessary.
+    """
+    host = urlsplit(url).netloc.lower()
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = RateLimiter(HOST_RATE_LIMITS.get(host, RATE_LIMIT),
+                                  BURST, MAX_BACKOFF)
+            _limiters[host] = limiter
+    return limiter
+
+
+def configure_rate_limits(rate=None, burst=None, max_backoff=None):
+    """Changes the default rate limit settings, starting every host afresh
+    with them.
+    """
+    global RATE_LIMIT, BURST, MAX_BACKOFF
+    if rate is not None:
+        RATE_LIMIT = rate
+    if burst is not None:
+        BURST = burst
+    if max_backoff is not None:
+        MAX_BACKOFF = max_backoff
+    with _limiters_lock:
+        _limiters.clear()
+
+
+def set_rate_limit(host, rate):
+    """Sets the requests per second allowed to a single host."""
+    host = host.lower()
+    with _limiters_lock:
+        HOST_RATE_LIMITS[host] = rate
+        _limiters.pop(host, None)
+
+
+class RateLimitedSession(requests.Session):
+    """A session that waits for the RateLimiter of a URL's host before
+    every request, and tells it how the request went.
+    """
+    def request(self, method, url, *args, **kwargs):
+        limiter = get_rate_limiter(url)
+        limiter.acquire()
+        try:
+            r = super(RateLimitedSession, self).request(method, url, *args,
+                                                        **kwargs)
+        except (requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError):
+            limiter.throttled()
+            raise
+        if r.status_code == 429 or r.status_code >= 500:
+            limiter.throttled(_retry_after(r))
+        else:
+            limiter.succeeded()
+        return r
+
+
+def _build_session():
+    s = RateLimitedSession()
+    s.headers['User-Agent'] = USER_AGENT
+    s.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    for prefix in ('http://', 'https://'):
+        s.mount(prefix, HTTPAdapter(pool_connections=POOL_CONNECTIONS,
+                                    pool_maxsize=POOL_MAXSIZE,
+                                    max_retries=MAX_RETRIES))
+    return s
+
+
+def get_session(url):
+    """Returns the shared session for the host of url, creating it if
+    necessary.
+    """
+    host = urlsplit(url).netloc.lower()
+    with _sessions_lock:
+        s = _sessions.get(host)
+        if s is None:
+            s = _build_session()
+            _sessions[host] = s
+    return s
+
+
+def configure_sessions(pool_connections=None, pool_maxsize=None,
+                       max_retries=None, user_agent=None):
+    """Changes the settings used for sessions, closing any existing ones so
+    that the new settings take effect on the next request.
+    """
+    global POOL_CONNECTIONS, POOL_MAXSIZE, MAX_RETRIES, USER_AGENT
+    if pool_connections is not None:
+        POOL_CONNECTIONS = pool_connections
+    if pool_maxsize is not None:
+        POOL_MAXSIZE = pool_maxsize
+    if max_retries is not None:
+        MAX_RETRIES = max_retries
+    if user_agent is not None:
+        USER_AGENT = user_agent
+    close_sessions()
+
+
+def close_sessions():
+    """Closes every session in the registry, releasing their connections."""
+    with _sessions_lock:
+        for s in _sessions.values():
+            s.close()
+        _sessions.clear()
@@ -1,16 +1,68 @@
-from requests import HTTPError
+import ast
+import imp
+import os
+import sys
+
+
+# The modules found for each court_id, so that asking again is free.
+_registry = {}
+
+
+def _find_path(court_id):
+    """Returns the path of the package directory or module file for a
+    dotted name, looked up the way import would, but without importing
+    anything. Raises ImportError if there isn't one.
+    """
+    parts = court_id.split('.')
+    top = sys.modules.get(parts[0])
+    if getattr(top, '__path__', None):
+        path = top.__path__[0]
+    else:
+        f, path, description = imp.find_module(parts[0])
+        if f is not None:
+            f.close()
+    for part in parts[1:]:
+        if not os.path.isdir(path):
+            raise ImportError('No module named %s' % court_id)
+        f, path, description = imp.find_module(part, [path])
+        if f is not None:
+            f.close()
+    return path
+
+
+def _read_all_attr(court_id, path):
+    """Returns the __all__ list of the package at path, or None if it
+    doesn't have one. It's read from the source of its __init__.py, falling
+    back to importing the package only if __all__ is built dynamically.
+    """
+    with open(os.path.join(path, '__init__.py')) as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and
+                any(isinstance(target, ast.Name) and target.id == '__all__'
+                    for target in node.targets)):
+            try:
+                return list(ast.literal_eval(node.value))
+            except ValueError:
+                return list(__import__(court_id, globals(), locals(),
+                                       ['__all__']).__all__)
+    return None
 
 
 def build_module_list(court_id):
     """Takes a string and builds up a list of modules to import.
 
-    This is a simple recursive function that iteratively looks for __all__
-    attributes in packages. If it finds one, it inspects each of the items in
-    it to see if each of those has an __all__ attribute. If they lack it, the
-    item is added to a list of modules.
+    Packages are walked through the __all__ lists in their __init__.py files.
+    If an item of __all__ is itself a package with an __all__, it's walked in
+    turn; otherwise, the item is added to a list of modules. The lists are
+    read from the source files, so nothing is imported: each scraper is only
+    imported when something needs its Site. The result for each court_id is
+    cached.
 
     Returns either a list of modules or in the case of errors, an empty list.
     """
+    if court_id in _registry:
+        return list(_registry[court_id])
     module_strings = []
 
     def find_all_attr_or_punt(court_id):
@@ -18,33 +70,35 @@ def build_module_list(court_id):
         adds the item to our list
         """
         try:
-            # Test that we have an __all__ attribute (proving that it's a
-            # package) something like: opinions.united_states.federal
-            all_attr = __import__(court_id, globals(), locals(), ['*']).__all__
-
-            # Build the modules back up to full imports
-            all_attr = ["%s.%s" % (court_id, item) for item in all_attr]
-            for module in all_attr:
-                # If we've made it this far, we have an __all__ attribute, so
-                # we should see if the items within that attribute do too. And
-                # so forth, recursively...
-                find_all_attr_or_punt(module)
-        except AttributeError:
+            path = _find_path(court_id)
+            all_attr = None
+            if os.path.isdir(path):
+                # A package, something like: opinions.united_states.federal
+                all_attr = _read_all_attr(court_id, path)
+        except ImportError, e:
+            # Something has gone wrong with the import
+            print "Import error: %s" % e
+            return
+        if all_attr is None:
             # Lacks the __all__ attribute. Probably of the form:
             # juriscraper.opinions.united_states.federal_appellate.ca1,
             # therefore, we add it to our list!
             module_strings.append(court_id)
-        except ImportError, e:
-            # Something has gone wrong with the import
-            print "Import error: %s" % e
-            return []
+            return
+
+        # Build the modules back up to full imports, and see if the items
+        # within that attribute have one too. And so forth, recursively...
+        for item in all_attr:
+            find_all_attr_or_punt("%s.%s" % (court_id, item))
 
     find_all_attr_or_punt(court_id)
 
+    _registry[court_id] = tuple(module_strings)
     return module_strings
 
 
 def site_yielder(iterable, mod):
+    from requests import HTTPError
     for i in iterable:
         try:
             site = mod.Site()
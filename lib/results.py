@@ -0,0 +1,145 @@
+"""The items parsed from a page, as a batch of columns.
+
+A Site keeps what it parses in parallel lists, one per attribute (case_names,
+case_dates, download_urls and so on). A ResultBatch wraps those lists, so that
+whole items can be read, filtered, sorted and serialized without walking every
+attribute by hand:
+
+    for row in site.results:
+        print row.case_names, row.case_dates
+
+    site.results.filter(lambda row: row.download_urls)
+
+A batch doesn't copy the columns. Changes made through it are made to the
+Site's own lists (and to any DeferringList, without fetching it), and rows are
+light views that only look up the values that are read.
+"""
+import datetime
+import json
+
+
+class ResultRow(object):
+    """One item of a ResultBatch. Each column is an attribute, read from the
+    batch when it's accessed.
+    """
+    __slots__ = ('_batch', '_index')
+
+    def __init__(self, batch, index):
+        self._batch = batch
+        self._index = index
+
+    def __getattr__(self, name):
+        try:
+            column = self._batch._columns[name]
+        except KeyError:
+            raise AttributeError(name)
+        return column[self._index]
+
+    def items(self):
+        """Returns the item as a list of (column name, value) pairs."""
+        return [(name, self._batch._columns[name][self._index])
+                for name in self._batch.names]
+
+    def __repr__(self):
+        return '<ResultRow %s>' % dict(self.items())
+
+
+class ResultBatch(object):
+    """Columns of equal length, keyed by name, and kept in the order of
+    names.
+    """
+    def __init__(self, names, columns, owner=None):
+        self.names = list(names)
+        self._columns = dict(zip(self.names, columns))
+        # The object the columns are attributes of, if any, so that columns
+        # that can't be changed in place (e.g., tuples) can be replaced.
+        self._owner = owner
+
+    @classmethod
+    def from_site(cls, site):
+        """Wraps every attribute of a Site that isn't None."""
+        names = [attr for attr in site._all_attrs
+                 if getattr(site, attr) is not None]
+        return cls(names, [getattr(site, name) for name in names], site)
+
+    def __len__(self):
+        if not self.names:
+            return 0
+        return len(self._columns[self.names[0]])
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('ResultBatch index out of range')
+        return ResultRow(self, index)
+
+    def __iter__(self):
+        for index in xrange(len(self)):
+            yield ResultRow(self, index)
+
+    def column(self, name):
+        return self._columns[name]
+
+    def take(self, indexes):
+        """Keeps only the items at indexes, in that order, changing every
+        column in place. Columns that aren't lists (e.g., tuples) are
+        replaced by lists, on the owner too.
+        """
+        for name in self.names:
+            column = self._columns[name]
+            if hasattr(column, 'permute'):
+                # A DeferringList, which is reordered without fetching it.
+                column.permute(indexes)
+            elif isinstance(column, list):
+                column[:] = [column[i] for i in indexes]
+            else:
+                column = self._columns[name] = [column[i] for i in indexes]
+                if self._owner is not None:
+                    setattr(self._owner, name, column)
+
+    def filter(self, predicate):
+        """Keeps only the items for which predicate(row) is true."""
+        self.take([row._index for row in self if predicate(row)])
+
+    def sort_by(self, name, reverse=False):
+        """Sorts the items by one column. The sort is stable, so items with
+        equal values keep their order. Only that column's values are read.
+        """
+        values = list(self._columns[name])
+        self.take(sorted(xrange(len(values)), key=values.__getitem__,
+                         reverse=reverse))
+
+    def extend(self, other):
+        """Appends the items of another batch with the same columns, as when
+        collecting the results of many pages. Any column of this batch that
+        isn't a list is replaced by a list of its values, on the owner too.
+        For a DeferringList, that fetches them.
+        """
+        if other.names != self.names:
+            raise ValueError('Cannot combine batches with different columns: '
+                             '%s and %s' % (self.names, other.names))
+        for name in self.names:
+            column = self._columns[name]
+            if not isinstance(column, list):
+                column = self._columns[name] = list(column)
+                if self._owner is not None:
+                    setattr(self._owner, name, column)
+            column.extend(other._columns[name])
+
+    def to_dicts(self):
+        """Returns the items as a list of dicts, one per item."""
+        columns = [self._columns[name] for name in self.names]
+        return [dict(zip(self.names, values)) for values in zip(*columns)]
+
+    def to_json(self, **kwargs):
+        """Serializes the items as a JSON list of objects, with dates in ISO
+        format. Keyword arguments are passed to json.dumps.
+        """
+        return json.dumps(self.to_dicts(), default=_json_default, **kwargs)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError('%r is not JSON serializable' % value)
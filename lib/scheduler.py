@@ -0,0 +1,154 @@
+"""Runs the parse() method of many courts at once.
+
+Scraping courts one after the other means that a full sweep takes as long as
+the sum of every court's latency, and a single slow court holds up all the
+others. The scrape_courts() generator in this module instead runs courts on a
+pool of threads and hands back each Site object as soon as it is finished.
+
+Threads are used rather than processes because the Site objects hold lxml
+trees and DeferringList fetchers, neither of which can be pickled and sent
+back from another process. Since scrapers spend nearly all of their time
+waiting on the network, threads work fine.
+"""
+import threading
+import time
+import traceback
+from Queue import Queue, Empty
+from urlparse import urlsplit
+
+from juriscraper.AbstractSite import logger
+
+
+class CourtTimeoutException(Exception):
+    def __init__(self, message):
+        Exception.__init__(self, message)
+
+
+def get_host(site):
+    """Returns the host a Site object will be downloading from, or an empty
+    string if it cannot be determined (e.g., for LOCAL files).
+    """
+    try:
+        return urlsplit(site.url).netloc.lower()
+    except AttributeError:
+        return ''
+
+
+def _run_court(module_string, site, results):
+    """Parses a single court, putting the outcome onto the results queue."""
+    try:
+        site.parse()
+        results.put((module_string, site, None))
+    except Exception:
+        results.put((module_string, site, traceback.format_exc()))
+
+
+def scrape_courts(module_strings, max_workers=8, max_per_host=2,
+                  timeout=None, method=None, setup=None):
+    """Parses many courts concurrently, yielding them as they complete.
+
+    :param module_strings: A list of modules to scrape, as returned by
+    lib.importer.build_module_list.
+    :param max_workers: The most courts that may be scraped at once.
+    :param max_per_host: The most courts that may be scraped at once from any
+    single host. Courts that share a host (e.g., the uscourts.gov sites) wait
+    their turn instead of piling onto the server.
+    :param timeout: The number of seconds a court may run before it is given
+    up on. A court that times out is yielded with a CourtTimeoutException
+    traceback and its slot is freed for the next court. Python threads cannot
+    be killed, so the abandoned thread finishes in the background and its
+    result is thrown away.
+    :param method: If provided, sets the method attribute of every Site (e.g.,
+    'LOCAL' during tests).
+    :param setup: If provided, a function that is called with every Site
+    before it is parsed, e.g. to give it a cache.
+
+    Yields tuples of (module_string, site, error). If the court was scraped
+    successfully, error is None; otherwise it is the formatted traceback of
+    the failure and site may be None or partially parsed.
+    """
+    results = Queue()
+    pending = list(module_strings)
+    running = {}
+    abandoned = set()
+    host_counts = {}
+    sites = {}
+
+    def release(module_string):
+        site, host, started = running.pop(module_string)
+        host_counts[host] -= 1
+
+    while pending or running:
+        # Start as many courts as our limits allow, skipping over courts whose
+        # host is already saturated so they don't block the rest of the queue.
+        i = 0
+        while i < len(pending) and len(running) < max_workers:
+            module_string = pending[i]
+            site = sites.get(module_string)
+            if site is None:
+                try:
+                    module = module_string.rsplit('.', 1)[1]
+                    mod = __import__(module_string, globals(), locals(),
+                                     [module])
+                    site = mod.Site()
+                    if method is not None:
+                        site.method = method
+                    if setup is not None:
+                        setup(site)
+                except Exception:
+                    pending.pop(i)
+                    yield module_string, None, traceback.format_exc()
+                    continue
+                sites[module_string] = site
+
+            host = get_host(site)
+            if host and host_counts.get(host, 0) >= max_per_host:
+                i += 1
+                continue
+
+            pending.pop(i)
+            del sites[module_string]
+            host_counts[host] = host_counts.get(host, 0) + 1
+            running[module_string] = (site, host, time.time())
+            logger.info("Scheduler starting court: %s" % module_string)
+            t = threading.Thread(target=_run_court,
+                                 args=(module_string, site, results))
+            t.daemon = True
+            t.start()
+
+        if not running:
+            continue
+
+        # Wait for the next court to finish, but no longer than it takes the
+        # oldest running court to hit its timeout.
+        if timeout is None:
+            wait = 1
+        else:
+            oldest = min(started for _, _, started in running.values())
+            wait = max(0, min(1, oldest + timeout - time.time()))
+        try:
+            module_string, site, error = results.get(timeout=wait)
+        except Empty:
+            pass
+        else:
+            if module_string in abandoned:
+                abandoned.discard(module_string)
+                logger.info("Scheduler discarding result of timed out court: "
+                            "%s" % module_string)
+            else:
+                release(module_string)
+                yield module_string, site, error
+
+        if timeout is not None:
+            now = time.time()
+            for module_string, (site, host, started) in running.items():
+                if now - started > timeout:
+                    release(module_string)
+                    abandoned.add(module_string)
+                    message = "%s: Court took more than %s seconds to " \
+                              "scrape." % (module_string, timeout)
+                    logger.warning(message)
+                    try:
+                        raise CourtTimeoutException(message)
+                    except CourtTimeoutException:
+                        yield module_string, site, traceback.format_exc()
@@ -0,0 +1,89 @@
+"""Timing and counters for the work a Site does in parse().
+
+Every Site records a SiteStats object in its stats attribute while it parses,
+which says how long each stage took (the download, each _get_<attr> method,
+_clean_attributes and so on), how many bytes were downloaded and how many
+deferred values were fetched. This tells you whether a slow court is slow on
+the network, in XPath, or in cleaning up the data.
+
+To send the stats somewhere once a Site is parsed, set its stats_sink
+attribute to a function that takes the Site, such as log_stats() below.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+# The logger set up in juriscraper.AbstractSite, which can't be imported here
+# since it imports this module.
+logger = logging.getLogger('Logger')
+
+
+class SiteStats(object):
+    """Wall time and call counts per stage, plus bytes downloaded and
+    deferred fetches.
+
+    times and counts are dicts keyed by stage name. Stages are named after
+    the method that does the work (e.g., '_download', '_get_case_names'),
+    except for 'parse', which covers the whole call, and 'deferred_fetch',
+    which sums the time spent in DeferringList fetchers. Since those fetches
+    may run in parallel, and happen while other stages are running, their
+    time overlaps the other stages. Values fetched after parse() returns are
+    added as they are fetched, so they aren't in the stats that were handed
+    to stats_sink, but they do show up in the Site's stats afterwards.
+    """
+    def __init__(self):
+        self.times = {}
+        self.counts = {}
+        self.bytes_downloaded = 0
+        self.deferred_fetches = 0
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.times[stage] = self.times.get(stage, 0) + seconds
+            self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    def add_deferred_fetch(self, seconds):
+        with self._lock:
+            self.times['deferred_fetch'] = (
+                self.times.get('deferred_fetch', 0) + seconds)
+            self.counts['deferred_fetch'] = (
+                self.counts.get('deferred_fetch', 0) + 1)
+            self.deferred_fetches += 1
+
+    def add_bytes(self, num_bytes):
+        with self._lock:
+            self.bytes_downloaded += num_bytes
+
+    @contextmanager
+    def timer(self, stage):
+        """Times the body of a with statement as a stage."""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(stage, time.time() - start)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'times': dict(self.times),
+                'counts': dict(self.counts),
+                'bytes_downloaded': self.bytes_downloaded,
+                'deferred_fetches': self.deferred_fetches,
+            }
+
+    def __str__(self):
+        stages = sorted(self.times.items(), key=lambda item: -item[1])
+        return '%s bytes, %s deferred fetches, %s' % (
+            self.bytes_downloaded,
+            self.deferred_fetches,
+            ', '.join('%s: %.3fs' % (stage, seconds)
+                      for stage, seconds in stages),
+        )
+
+
+def log_stats(site):
+    """A stats_sink that logs the stats of a Site in a single line."""
+    logger.info("%s: Parse stats: %s" % (site.court_id, site.stats))
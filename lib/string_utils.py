@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 import re
+import threading
+from collections import OrderedDict
 
 # For use in titlecase
 BIG = ('3D|AFL|AKA|A/K/A|BMG|CBS|CDC|CDT|CEO|CIO|CNMI|D/B/A|DOJ|DVA|EFF|FCC|'
@@ -24,6 +26,9 @@ APOS_SECOND = re.compile(r"^[dol]{1}['‘]{1}[a-z]+$", re.I)
 ALL_CAPS = re.compile(r'^[A-Z\s%s%s%s]+$' % (PUNCT, WEIRD_CHARS, NUMS))
 UC_INITIALS = re.compile(r"^(?:[A-Z]{1}\.{1}|[A-Z]{1}\.{1}[A-Z]{1})+,?$")
 MAC_MC = re.compile(r'^([Mm]a?c)(\w+.*)')
+LINE_BREAKS = re.compile('[\r\n]+')
+WORD_BREAKS = re.compile('[\t ]')
+UPPER_V = re.compile(r'\WV\.\W')
 def titlecase(text, DEBUG=False):
     """Titlecases input text
 
@@ -38,7 +43,7 @@ def titlecase(text, DEBUG=False):
 
     List of "BIG words" grows over time as entries are needed.
     """
-    text_sans_small_words = re.sub(SMALL_WORD_INLINE, '', text)
+    text_sans_small_words = SMALL_WORD_INLINE.sub('', text)
     if text_sans_small_words.isupper():
         # if, after removing small words, the entire string is uppercase,
         # we lowercase it
@@ -48,11 +53,11 @@ def titlecase(text, DEBUG=False):
     elif not text_sans_small_words.isupper() and DEBUG:
         print "Entire string not upper case. Not lowercasing: %s" % text
 
-    lines = re.split('[\r\n]+', text)
+    lines = LINE_BREAKS.split(text)
     processed = []
     for line in lines:
         all_caps = ALL_CAPS.match(line)
-        words = re.split('[\t ]', line)
+        words = WORD_BREAKS.split(line)
         tc_line = []
         for word in words:
             if DEBUG:
@@ -160,10 +165,10 @@ def titlecase(text, DEBUG=False):
             m.group(2).capitalize()), result)
 
         processed.append(result)
-        text = "\n".join(processed)
+    text = "\n".join(processed)
 
     # replace V. with v.
-    text = re.sub(re.compile(r'\WV\.\W'), ' v. ', text)
+    text = UPPER_V.sub(' v. ', text)
 
     return text
 
@@ -241,6 +246,11 @@ BW = 'appell(ee|ant)s?|claimants?|complainants?|defendants?|defendants?(--?|/)ap
      '|respond(e|a)nts?(--?|/)appell(ee|ant)s?|cross(--?|/)respondents?|crosss?(--?|/)petitioners?' + \
      '|cross(--?|/)appell(ees|ant)s?|deceased'
 BAD_WORDS = re.compile(r'^(%s)(,|\.)?$' % BW, re.I)
+LOWER_VS = re.compile(r'\Wvs\.\W')
+BARE_V = re.compile(r' v ')
+BARE_VS = re.compile(r' vs ')
+US_ONLY = re.compile(r'^US$')
+CASE_NUMBER_PREFIX = re.compile(r'^Nos?\.\s+')
 def harmonize(text):
     """Fixes case names so they are cleaner.
 
@@ -258,22 +268,22 @@ def harmonize(text):
 
     result = ''
     # replace vs. with v.
-    text = re.sub(re.compile(r'\Wvs\.\W'), ' v. ', text)
+    text = LOWER_VS.sub(' v. ', text)
 
     # replace V. with v.
-    text = re.sub(re.compile(r'\WV\.\W'), ' v. ', text)
+    text = UPPER_V.sub(' v. ', text)
 
     # replace v with v.
-    text = re.sub(re.compile(r' v '), ' v. ', text)
+    text = BARE_V.sub(' v. ', text)
 
     # and finally, vs with v.
-    text = re.sub(re.compile(r' vs '), ' v. ', text)
+    text = BARE_VS.sub(' v. ', text)
 
     # Remove the BAD_WORDS.
     text = text.split()
     cleaned_text = []
     for word in text:
-        word = re.sub(BAD_WORDS, '', word)
+        word = BAD_WORDS.sub('', word)
         cleaned_text.append(word)
     text = ' '.join(cleaned_text)
 
@@ -289,7 +299,7 @@ def harmonize(text):
         else:
             # needed here, because we can't put "US" as a case-insensitive
             # word into the UNITED_STATES regex.
-            frag = re.sub(re.compile(r'^US$'), 'United States', frag)
+            frag = US_ONLY.sub('United States', frag)
             # no match
             result += frag
 
@@ -299,15 +309,19 @@ def harmonize(text):
         i += 1
 
     # Remove the ET_AL words.
-    result = re.sub(ET_AL, '', result)
+    result = ET_AL.sub('', result)
 
     # Fix the No. and Nos.
     if result.startswith('No.') or result.startswith('Nos.'):
-        result = re.sub(r'^Nos?\.\s+', '', result)
+        result = CASE_NUMBER_PREFIX.sub('', result)
 
     return clean_string(result)
 
 
+# For use in clean_string
+BAD_PUNCTUATION = u'(-|–|/|;|,|\s)*'
+BAD_ENDINGS = re.compile(r'%s$' % BAD_PUNCTUATION)
+BAD_BEGINNINGS = re.compile(r'^%s' % BAD_PUNCTUATION)
 def clean_string(string):
     """Clean up strings.
 
@@ -337,15 +351,11 @@ def clean_string(string):
     # we don't know the order of the various punctuation items to be stripped.
     # We split on the v., and handle fixes at either end of plaintiff or
     # appellant.
-    bad_punctuation = u'(-|–|/|;|,|\s)*'
-    bad_endings = re.compile(r'%s$' % bad_punctuation)
-    bad_beginnings = re.compile(r'^%s' % bad_punctuation)
-
     string = string.split(' v. ')
     cleaned_string = []
     for frag in string:
-        frag = re.sub(bad_endings, '', frag)
-        frag = re.sub(bad_beginnings, '', frag)
+        frag = BAD_ENDINGS.sub('', frag)
+        frag = BAD_BEGINNINGS.sub('', frag)
         cleaned_string.append(frag)
     string = ' v. '.join(cleaned_string)
 
@@ -355,6 +365,72 @@ def clean_string(string):
     return string
 
 
+class _Memo(object):
+    """A thread-safe, least-recently-used memo of a one-argument string
+    function, keeping at most maxsize results.
+
+    Results are keyed on the type as well as the value of the argument, since
+    'a' == u'a', but titlecase('a') and titlecase(u'a') differ in type.
+    """
+    def __init__(self, func, maxsize=10000):
+        self.func = func
+        self.maxsize = maxsize
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, s):
+        key = (type(s), s)
+        with self._lock:
+            try:
+                result = self._results.pop(key)
+            except KeyError:
+                pass
+            else:
+                self._results[key] = result
+                return result
+        result = self.func(s)
+        with self._lock:
+            self._results[key] = result
+            if len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+
+_clean_string_memo = _Memo(clean_string)
+_harmonize_memo = _Memo(harmonize)
+_titlecase_memo = _Memo(titlecase)
+
+
+def clean_strings(strings):
+    """Runs clean_string over a list, as when cleaning a whole column of
+    results, passing through any items that aren't strings.
+
+    The same values turn up again and again (the same parties, on every
+    poll of a court), so results are memoized. The output is identical to
+    calling clean_string on each item.
+    """
+    return [_clean_string_memo(s) if isinstance(s, basestring) else s
+            for s in strings]
+
+
+def harmonize_strings(strings):
+    """Runs harmonize over a list, memoizing the results like
+    clean_strings.
+    """
+    return [_harmonize_memo(s) for s in strings]
+
+
+def titlecase_strings(strings):
+    """Runs titlecase over a list, memoizing the results like
+    clean_strings.
+    """
+    return [_titlecase_memo(s) for s in strings]
+
+
 def force_unicode(s, encoding='utf-8', strings_only=False, errors='strict'):
     # Borrows heavily from django.utils.encoding.force_unicde.
     # This should be applied to *input* not *output*!
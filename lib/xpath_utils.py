@@ -0,0 +1,86 @@
+"""A shared cache of compiled XPath expressions.
+
+Calling element.xpath(path) makes lxml compile path again every time, even
+though scrapers use the same handful of literal expressions on every page
+(and on every one of the thousands of pages of a back-scrape). The xpath()
+function here evaluates expressions the same way, but compiles each one only
+once, keeping the lxml.etree.XPath objects in a cache shared by the whole
+process.
+
+Like the cache in the re module, the cache is simply emptied if it grows past
+MAX_CACHE_SIZE, which only happens if expressions are being built on the fly.
+Use cache_info() to see how well it's working.
+"""
+import threading
+
+from lxml import etree
+
+MAX_CACHE_SIZE = 1000
+
+REGEXP_NAMESPACE = 'http://exslt.org/regular-expressions'
+
+_cache = {}
+_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def compile_xpath(path, namespaces=None, regexp=True, smart_strings=True):
+    """Returns a compiled lxml.etree.XPath for path, from the cache if
+    possible.
+
+    :param namespaces: A dict of prefixes to namespace URIs used in path.
+    :param regexp: Whether to enable the EXSLT regular expression functions
+    (re:test(), re:match() and re:replace()), as element.xpath() does. Unlike
+    element.xpath(), the re prefix doesn't need to be passed in namespaces.
+    :param smart_strings: Whether string results should know their parent
+    element, as they do with element.xpath(). Turning this off saves memory.
+    """
+    global _hits, _misses
+    if regexp and 're' not in (namespaces or {}):
+        namespaces = dict(namespaces or {}, re=REGEXP_NAMESPACE)
+    key = (path, tuple(sorted((namespaces or {}).items())), regexp,
+           smart_strings)
+    with _lock:
+        compiled = _cache.get(key)
+        if compiled is not None:
+            _hits += 1
+            return compiled
+        _misses += 1
+    compiled = etree.XPath(path, namespaces=namespaces, regexp=regexp,
+                           smart_strings=smart_strings)
+    with _lock:
+        if len(_cache) >= MAX_CACHE_SIZE:
+            _cache.clear()
+        _cache[key] = compiled
+    return compiled
+
+
+def xpath(node, path, namespaces=None, regexp=True, smart_strings=True,
+          **variables):
+    """Evaluates path against node (an element or tree), giving the same
+    results as node.xpath(path), but using a cached, compiled expression.
+
+    Any extra keyword arguments are passed to the expression as XPath
+    variables (e.g., $n), which lets one compiled expression serve many
+    values instead of formatting them into the string.
+    """
+    return compile_xpath(path, namespaces, regexp, smart_strings)(
+        node, **variables)
+
+
+def cache_info():
+    """Returns a dict with the number of hits, misses and cached
+    expressions.
+    """
+    with _lock:
+        return {'hits': _hits, 'misses': _misses, 'size': len(_cache)}
+
+
+def clear_cache():
+    """Empties the cache and resets its counters."""
+    global _hits, _misses
+    with _lock:
+        _cache.clear()
+        _hits = 0
+        _misses = 0
@@ -34,16 +34,15 @@ Courts. The person to call about it is Myra Sabel. She's very helpful and her
 number is 334-229-0580.
 
 """
-import os
 import re
 from datetime import datetime
 
 from juriscraper.DeferringList import DeferringList
-import requests
 from juriscraper.AbstractSite import logger
 from juriscraper.OpinionSite import OpinionSite
+from juriscraper.lib.browser_utils import get_browser_pool
 from juriscraper.lib.cookie_utils import normalize_cookies
-from selenium import webdriver
+from juriscraper.lib.http_utils import get_session
 
 
 class Site(OpinionSite):
@@ -60,10 +59,10 @@ class Site(OpinionSite):
             # No need for cookies when testing.
             return super(Site, self)._download(request_dict={})
         else:
-            r = requests.post(
-                'http://2.alalinc.net/session/login/',
+            login_url = 'http://2.alalinc.net/session/login/'
+            r = get_session(login_url).post(
+                login_url,
                 data={'uid': 'juriscraper', 'pwd': 'freelaw'},
-                headers={'User-Agent': 'Juriscraper'}
             )
             self.cookies = normalize_cookies(r.cookies)
             return super(Site, self)._download(request_dict={'cookies': self.cookies})
@@ -117,22 +116,14 @@ class Site(OpinionSite):
                 return "No case names fetched during tests."
             else:
                 full_url = 'http://2.alalinc.net/library/view/file/?lib=SUPREME&file={seed}'.format(seed=html_link)
-                driver = webdriver.PhantomJS(
-                    executable_path='/usr/local/phantomjs/phantomjs',
-                    service_log_path=os.path.devnull,  # Disable ghostdriver.log
-                )
-
-                r = requests.get(
-                    full_url,
-                    headers={'User-Agent': 'Juriscraper'},
-                    cookies=self.cookies,
-                )
+                r = get_session(full_url).get(full_url, cookies=self.cookies)
                 r.raise_for_status()
 
-                # Create a fake HTML page from r.text that can be requested by
-                # selenium. See: https://stackoverflow.com/questions/24834838/
-                driver.get('data:text/html,' + r.text)
-                case_name = driver.find_element_by_xpath("//table[contains(descendant::text(), 'Description')]//tr[2]").text
+                with get_browser_pool().lease() as driver:
+                    # Create a fake HTML page from r.text that can be requested
+                    # by selenium. See: https://stackoverflow.com/questions/24834838/
+                    driver.get('data:text/html,' + r.text)
+                    case_name = driver.find_element_by_xpath("//table[contains(descendant::text(), 'Description')]//tr[2]").text
                 case_name = ' '.join(case_name.split())
                 case_name = case_name.split('(')[0]
                 case_name = case_name.split('PETITION')[0]
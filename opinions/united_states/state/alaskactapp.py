@@ -9,8 +9,7 @@ History:
 """
 
 from juriscraper.OpinionSite import OpinionSite
-import time
-from datetime import date
+from juriscraper.lib.date_utils import parse_date
 
 
 class Site(OpinionSite):
@@ -31,6 +30,7 @@ class Site(OpinionSite):
             "%B %d, %Y",
             "%B %Y",
         )
+        key = (self.court_id, 'case_dates')
         for h2_element in self.html.xpath('//h2[following-sibling::ul//a/em]'):
             date_string = str(h2_element.xpath('./text()')[0])
 
@@ -42,13 +42,7 @@ class Site(OpinionSite):
                 # This depends on the dates being parsed first.
                 return dates
 
-            for frmt in date_formats:
-                try:
-                    d = date.fromtimestamp(
-                        time.mktime(time.strptime(date_string, frmt)))
-                    break
-                except ValueError:
-                    continue
+            d = parse_date(date_string, date_formats, key).date()
 
             # Determine the number of links below the date and add them all to
             # the date list.
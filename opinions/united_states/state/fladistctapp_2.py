@@ -10,7 +10,6 @@
 
 from datetime import date
 import time
-import requests
 from lxml import html
 
 from juriscraper.AbstractSite import logger
@@ -29,13 +28,10 @@ class Site(OpinionSite):
 
     def _download(self, request_dict={}):
         html_l = super(Site, self)._download(request_dict)
-        s = requests.session()
         html_trees = []
         for url in html_l.xpath("//*[@class='cen']/a/@href"):
             logger.info("Getting sub-url: {url}".format(url=url))
-            r = s.get(url,
-                      headers={'User-Agent': 'Juriscraper'},
-                      **request_dict)
+            r = self._send('GET', url, **request_dict)
             r.raise_for_status()
 
             # If the encoding is iso-8859-1, switch it to cp1252 (a superset)
@@ -10,7 +10,6 @@ from datetime import date
 from juriscraper.lib.string_utils import titlecase
 import re
 import time
-import requests
 from lxml import html
 
 from juriscraper.OpinionSite import OpinionSite
@@ -26,7 +25,6 @@ class Site(OpinionSite):
 
     def _download(self, request_dict={}):
         html_l = super(Site, self)._download(request_dict)
-        s = requests.session()
         html_trees = []
         # this path reads the row for the last month in that year
         path = "//th[contains(., '{year}')]/following::tr[1]/td[position()>1]/a[contains(., '/')]/@href".format(
@@ -35,9 +33,7 @@ class Site(OpinionSite):
         # to get all the dates in that page the following path can be used:
         # path = "//th/following::tr/td[position()>1]/a[contains(., '/')]/@href"
         for url in html_l.xpath(path):
-            r = s.get(url,
-                      headers={'User-Agent': 'Juriscraper'},
-                      **request_dict)
+            r = self._send('GET', url, **request_dict)
             r.raise_for_status()
 
             # If the encoding is iso-8859-1, switch it to cp1252 (a superset)
@@ -12,7 +12,6 @@ from datetime import date
 import re
 import time
 
-import requests
 from lxml import html
 from juriscraper.OpinionSite import OpinionSite
 
@@ -27,16 +26,13 @@ class Site(OpinionSite):
 
     def _download(self, request_dict={}):
         html_l = super(Site, self)._download(request_dict)
-        s = requests.session()
         html_trees = []
         # this path reads the links for the last month in that year
         path = "id('opinions')//h2[string-length()>2][last()]/following::a[string-length()=10]/@href[not(contains(., 'pdf'))]"
         # to get all the dates in that page the following path can be used:
         # path = "id('opinions')//a[string-length()=10]"
         for url in html_l.xpath(path):
-            r = s.get(url,
-                      headers={'User-Agent': 'Juriscraper'},
-                      **request_dict)
+            r = self._send('GET', url, **request_dict)
             r.raise_for_status()
 
             # If the encoding is iso-8859-1, switch it to cp1252 (a superset)
@@ -14,7 +14,6 @@ History:
 from datetime import date
 import re
 import time
-import requests
 from lxml import html
 
 from juriscraper.OpinionSite import OpinionSite
@@ -30,16 +29,13 @@ class Site(OpinionSite):
 
     def _download(self, request_dict={}):
         html_l = super(Site, self)._download(request_dict)
-        s = requests.session()
         html_trees = []
         # this path reads the link of the last 2 dates
         path = "(//a[contains(./@href, 'filings')])[position() < 3]/@href"
         # to get all the dates in that page the following path can be used:
         # path = "//a[contains(./@href, 'filings')]"
         for url in html_l.xpath(path):
-            r = s.get(url,
-                      headers={'User-Agent': 'Juriscraper'},
-                      **request_dict)
+            r = self._send('GET', url, **request_dict)
             r.raise_for_status()
 
             # If the encoding is iso-8859-1, switch it to cp1252 (a superset)
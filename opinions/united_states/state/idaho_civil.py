@@ -6,18 +6,27 @@ History:
 """
 
 import re
-import time
 from juriscraper.OpinionSite import OpinionSite
+from juriscraper.lib.date_utils import parse_date
 from juriscraper.lib.string_utils import clean_string
-from datetime import date
+from juriscraper.lib.xpath_utils import xpath
 from lxml import html
 
 
 class Site(OpinionSite):
+    # The opinion lists are long, so they are streamed. See row_tag.
+    row_tag = 'li'
+
     def __init__(self):
         super(Site, self).__init__()
         self.url = 'http://www.isc.idaho.gov/appeals-court/sccivil'
         self.court_id = self.__module__
+        # Set here rather than on the class, since it uses our methods.
+        self.row_fields = {
+            'case_names': self._return_case_name,
+            'download_urls': 'a[1]/@href | span/a[1]/@href',
+            'case_dates': self._return_case_date,
+        }
 
     def tweak_request_object(self, r):
         """
@@ -25,52 +34,35 @@ class Site(OpinionSite):
         """
         r.encoding = 'UTF-8'
 
-    def _get_case_names(self):
-        case_names = []
-        for e in self.html.xpath('//div[@id = "block-system-main"]//li'):
-            paths = ['a[1]', 'span/a[1]']
-            for path in paths:
-                try:
-                    e = e.xpath(path)[0]
-                    s = html.tostring(e, method='text', encoding='unicode')
-                except IndexError:
-                    continue
-            s = ' '.join(s.split())
-            regexes = [u'(.*?) [-–] (.*?)– ',
-                       u'(.*?) [-–] (.*)- ',
-                       u'(.*?) [-–] (.*)$',
-                       u'(.*[0-9]{4})(.*)']
-            for regex in regexes:
-                try:
-                    case_names.append(re.search(regex, s).group(2))
-                    # Found what we're looking for...
-                    break
-                except AttributeError:
-                    # Try the next regex...
-                    continue
-        return case_names
+    def _keep_row(self, row):
+        return bool(xpath(row, 'ancestor::div[contains(concat(" ", @class, " "), " field-items ")]'
+                               '/ancestor::div[@id = "block-system-main"]'))
 
-    def _get_download_urls(self):
-        download_urls = []
-        for e in self.html.xpath('//div[@id = "block-system-main"]//div[contains(concat(" ", @class, " "), " field-items ")]//li/a[1]/@href|'
-                                 '//div[@id = "block-system-main"]//div[contains(concat(" ", @class, " "), " field-items ")]//li/span/a[1]/@href'):
-            download_urls.append(e)
-        return download_urls
+    def _return_case_name(self, e):
+        paths = ['a[1]', 'span/a[1]']
+        for path in paths:
+            try:
+                e = xpath(e, path)[0]
+                s = html.tostring(e, method='text', encoding='unicode')
+            except IndexError:
+                continue
+        s = ' '.join(s.split())
+        regexes = [u'(.*?) [-–] (.*?)– ',
+                   u'(.*?) [-–] (.*)- ',
+                   u'(.*?) [-–] (.*)$',
+                   u'(.*[0-9]{4})(.*)']
+        for regex in regexes:
+            try:
+                return re.search(regex, s).group(2)
+            except AttributeError:
+                # Try the next regex...
+                continue
 
-    def _get_case_dates(self):
-        case_dates = []
-        for e in self.html.xpath('//div[@id = "block-system-main"]//div[contains(concat(" ", @class, " "), " field-items ")]//li'):
-            s = html.tostring(e, method='text', encoding='unicode')
-            s = re.search('(.*[0-9]{4})', s).group(1)
-            date_formats = ['%B %d, %Y',
-                            '%B %d %Y']
-            for format in date_formats:
-                try:
-                    case_date = date.fromtimestamp(time.mktime(time.strptime(clean_string(s), format)))
-                except ValueError:
-                    continue
-            case_dates.append(case_date)
-        return case_dates
+    def _return_case_date(self, e):
+        s = html.tostring(e, method='text', encoding='unicode')
+        s = re.search('(.*[0-9]{4})', s).group(1)
+        return parse_date(clean_string(s), ('%B %d, %Y', '%B %d %Y'),
+                          key=(self.court_id, 'case_dates')).date()
 
     def _get_precedential_statuses(self):
         return ["Published"] * len(self.case_names)
@@ -9,7 +9,6 @@
 from datetime import date
 import time
 from lxml import html
-import requests
 import re
 
 from juriscraper.OpinionSite import OpinionSite
@@ -29,12 +28,9 @@ class Site(OpinionSite):
             html_trees = [super(Site, self)._download(request_dict=request_dict)]
         else:
             html_l = OpinionSite._download(self)
-            s = requests.session()
             html_trees = []
             for url in html_l.xpath("//td[@width='49%']//tr[contains(., ', {year}')]/td[5]/a/@href".format(year=self.year)):
-                r = s.get(url,
-                          headers={'User-Agent': 'Juriscraper'},
-                          **request_dict)
+                r = self._send('GET', url, **request_dict)
                 r.raise_for_status()
 
                 # If the encoding is iso-8859-1, switch it to cp1252 (a
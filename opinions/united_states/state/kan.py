@@ -11,7 +11,6 @@ import time
 import re
 
 from lxml import etree, html
-import requests
 from juriscraper.OpinionSite import OpinionSite
 from juriscraper.AbstractSite import logger
 
@@ -30,7 +29,6 @@ class Site(OpinionSite):
             html_trees = [super(Site, self)._download(request_dict=request_dict)]
         else:
             html_l = OpinionSite._download(self)
-            s = requests.session()
             html_trees = []
             # The latest 5 urls on the page.
             path = "//td[@width='50%'][{court_index}]/h3[contains(., '{year}')]/following::ul[1]//a/@href".format(
@@ -39,9 +37,7 @@ class Site(OpinionSite):
             )
             for url in html_l.xpath(path)[0:4]:
                 logger.info("Downloading Kansas page at: {url}".format(url=url))
-                r = s.get(url,
-                          headers={'User-Agent': 'Juriscraper'},
-                          **request_dict)
+                r = self._send('GET', url, **request_dict)
                 r.raise_for_status()
 
                 # If the encoding is iso-8859-1, switch it to cp1252 (a superset)
@@ -35,7 +35,6 @@ Notes:
 import re
 from datetime import datetime
 
-import requests
 from lxml import html
 from juriscraper.lib.string_utils import titlecase
 from juriscraper.DeferringList import DeferringList
@@ -43,6 +42,10 @@ from juriscraper.OpinionSite import OpinionSite
 
 
 class Site(OpinionSite):
+    hrefs_contain = 'Opinions'
+    # One row per link to an opinion with a valid docket number.
+    row_path = "//a[@href[contains(., '{m}')]]".format(m=hrefs_contain)
+
     def __init__(self):
         super(Site, self).__init__()
         self.court_id = self.__module__
@@ -64,12 +67,15 @@ class Site(OpinionSite):
         }
         self.method = 'POST'
         self.docket_number_regex = re.compile('(?P<year>\d{4})-(?P<court>[SC]{2})-(?P<docket_num>\d+)')
-        self.hrefs_contain = 'Opinions'
+        # Set here rather than on the class, since it uses our methods.
+        self.row_fields = {
+            'download_urls': './@href',
+            'docket_numbers': self._return_docket_number_from_str,
+            'case_dates': self._return_case_date,
+        }
 
-    def _get_download_urls(self):
-        path = "//a[@href[contains(., '{m}')]]".format(m=self.hrefs_contain)
-        elems = filter(self._has_valid_docket_number, self.html.xpath(path))
-        return [e.xpath('./@href')[0] for e in elems]
+    def _keep_row(self, row):
+        return self._has_valid_docket_number(row)
 
     def _get_case_names(self):
         def fetcher(e):
@@ -83,9 +89,9 @@ class Site(OpinionSite):
                 anchor_text = html.tostring(e, method='text', encoding='unicode')
                 m = self.docket_number_regex.search(anchor_text)
 
-                r = requests.post(
+                r = self._request(
+                    'POST',
                     url,
-                    headers={'User-Agent': 'Juriscraper'},
                     data={
                         'txtyear': m.group('year'),
                         'txtcasenumber': m.group('docket_num').strip('0'),
@@ -114,16 +120,9 @@ class Site(OpinionSite):
                         break
                 return ' v. '.join(case_name_parts)
 
-        # Get the docket numbers to use for queries.
-        path = "//a[@href[contains(., '{m}')]]".format(m=self.hrefs_contain)
-        elements = filter(self._has_valid_docket_number, self.html.xpath(path))
-        return DeferringList(seed=elements, fetcher=fetcher)
-
-    def _get_docket_numbers(self):
-        path = "//a[@href[contains(., '{m}')]]".format(
-            m=self.hrefs_contain)
-        elements = filter(self._has_valid_docket_number, self.html.xpath(path))
-        return map(self._return_docket_number_from_str, elements)
+        # The links hold the docket numbers to use for queries.
+        return DeferringList(seed=list(self._rows), fetcher=fetcher,
+                             max_workers=4)
 
     def _has_valid_docket_number(self, e):
         text = html.tostring(e, method='text', encoding='unicode')
@@ -141,19 +140,15 @@ class Site(OpinionSite):
             docket_num=m.group('docket_num')
         )
 
-    def _get_case_dates(self):
-        path = "//tr[descendant::a[@href[contains(., '{m}')]]]/td[2]".format(
-            m=self.hrefs_contain)
-        elements = filter(self._has_valid_docket_number, self.html.xpath(path))
-        dates = []
-        for e in elements:
-            for s in e.xpath('.//text()'):
-                s = s.strip()
-                try:
-                    dates.append(datetime.strptime(s, '%m/%d/%Y').date())
-                except ValueError:
-                    pass
-        return dates
+    @staticmethod
+    def _return_case_date(e):
+        """The date is in the second cell of the link's row."""
+        for s in e.xpath('./ancestor::tr[1]/td[2]//text()'):
+            s = s.strip()
+            try:
+                return datetime.strptime(s, '%m/%d/%Y').date()
+            except ValueError:
+                pass
 
     def _get_precedential_statuses(self):
         # noinspection PyUnresolvedReferences
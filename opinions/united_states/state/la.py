@@ -6,7 +6,6 @@
 # Date: 2014-07-05
 
 from lxml import html
-import requests
 
 from juriscraper.lib.string_utils import titlecase
 from juriscraper.OpinionSite import OpinionSite
@@ -24,13 +23,10 @@ class Site(OpinionSite):
 
     def _download(self, request_dict={}):
         html_l = OpinionSite._download(self)
-        s = requests.session()
         html_trees = []
         for url in html_l.xpath("//td[contains(./text(),'Opinion') or contains(./text(), 'PER CURIAM')]"
                                 "/preceding-sibling::td[1]//@href")[:2]:
-            r = s.get(url,
-                      headers={'User-Agent': 'Juriscraper'},
-                      **request_dict)
+            r = self._send('GET', url, **request_dict)
             r.raise_for_status()
 
             # If the encoding is iso-8859-1, switch it to cp1252 (a superset)
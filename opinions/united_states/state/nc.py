@@ -14,6 +14,7 @@ import traceback
 
 from juriscraper.AbstractSite import InsanityException
 from juriscraper.OpinionSite import OpinionSite
+from juriscraper.lib.xpath_utils import xpath
 from lxml import html
 
 
@@ -36,11 +37,11 @@ class Site(OpinionSite):
         precedential_status = "Published"
         date_cleaner = "\d+ \w+ [12][90]\d\d"
         path = '//table//tr'
-        for row_el in self.html.xpath(path):
+        for row_el in xpath(self.html, path):
             # Examine each row. If it contains the date, we set that as
             # the current date. If it contains a case, we parse it.
             try:
-                date_nodes = row_el.xpath('.//strong/text()')
+                date_nodes = xpath(row_el, './/strong/text()')
                 date_str = date_nodes[0]
                 if date_nodes:
                     date_str = re.search(date_cleaner,
@@ -54,14 +55,14 @@ class Site(OpinionSite):
                 pass
 
             path = "./td[contains(., 'Unpublished Opinions - Rule 30e')]"
-            if row_el.xpath(path):
+            if xpath(row_el, path):
                 precedential_status = "Unpublished"
                 # When this header appears, switch to Nonprecedential, then
                 # press on to the following rows.
                 continue
 
             if precedential_status == "Published":
-                urls = row_el.xpath('./td/span/span[1]/@onclick')
+                urls = xpath(row_el, './td/span/span[1]/@onclick')
                 # Like: viewOpinion("http://appellate.nccourts.org/opinions/?c=1&amp;pdf=31511")
                 if len(urls) != 1 or urls[0].find('viewOpinion') != 0:
                     continue  # Only interested in cases with a download link
@@ -74,14 +75,14 @@ class Site(OpinionSite):
                 ).group(1)
 
                 path = "./td/span/span[contains(@class,'title')]"
-                txt = html.tostring(row_el.xpath(path)[0],
+                txt = html.tostring(xpath(row_el, path)[0],
                                     method='text',
                                     encoding='unicode')
                 case_name, neutral_cite, docket_number = self.parse_title(txt)
 
                 summary = ""
                 path = "./td/span/span[contains(@class,'desc')]/text()"
-                summaries = row_el.xpath(path)
+                summaries = xpath(row_el, path)
                 try:
                     summary = summaries[0]
                 except IndexError:
@@ -99,7 +100,7 @@ class Site(OpinionSite):
                 self.my_precedential_statuses.append(precedential_status)
 
             elif precedential_status == "Unpublished":
-                for span in row_el.xpath('./td/span'):
+                for span in xpath(row_el, './td/span'):
                     if 'onclick' not in span.attrib.keys():
                         continue
                     download_url = re.search('viewopinion\("(.*)"',
@@ -13,6 +13,9 @@ from juriscraper.OpinionSite import OpinionSite
 
 
 class Site(OpinionSite):
+    # The pages carry hundreds of links, but only the download URLs are used.
+    lazy_links = True
+
     def __init__(self):
         super(Site, self).__init__()
         # This is the URL for the past months
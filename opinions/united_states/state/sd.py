@@ -3,17 +3,15 @@
 # - 2013-06-11: Birth.
 # - 2013-08-06: Revised by Brian Carver
 # - 2014-08-05: Updated URL by mlr
-import os
-
 import re
 from datetime import datetime
 
 from juriscraper.AbstractSite import logger
 from juriscraper.OpinionSite import OpinionSite
+from juriscraper.lib.browser_utils import browser_for
 from juriscraper.lib.string_utils import titlecase
 from urlparse import urlsplit, urljoin, urlunsplit
 from lxml import html
-from selenium import webdriver
 
 
 class Site(OpinionSite):
@@ -66,25 +64,21 @@ class Site(OpinionSite):
 
     def _download_backwards(self, page_year):
         logger.info("Running PhantomJS with params: %s" % (page_year,))
-        driver = webdriver.PhantomJS(
-            executable_path='/usr/local/phantomjs/phantomjs',
-            service_log_path=os.path.devnull,  # Disable ghostdriver.log
-        )
-        driver.implicitly_wait(30)
-        driver.get(self.url)
+        with browser_for(self) as driver:
+            driver.implicitly_wait(30)
+            driver.get(self.url)
 
-        # Select the year (this won't trigger a GET unless it's changed)
-        path = "//*[@id='ContentPlaceHolder1_PageContent_OpinionYears']/option[@value={year}]".format(year=page_year[1])
-        option = driver.find_element_by_xpath(path)
-        option.click()
+            # Select the year (this won't trigger a GET unless it's changed)
+            path = "//*[@id='ContentPlaceHolder1_PageContent_OpinionYears']/option[@value={year}]".format(year=page_year[1])
+            option = driver.find_element_by_xpath(path)
+            option.click()
 
-        if page_year[0] != 0:
-            # Not the first, page, go to the one desired.
-            links = driver.find_elements_by_xpath("//a[@href[contains(., 'Page')]]")
-            links[page_year[0] - 1].click()
+            if page_year[0] != 0:
+                # Not the first, page, go to the one desired.
+                links = driver.find_elements_by_xpath("//a[@href[contains(., 'Page')]]")
+                links[page_year[0] - 1].click()
 
-        text = self._clean_text(driver.page_source)
-        driver.close()
+            text = self._clean_text(driver.page_source)
         html_tree = html.fromstring(text)
 
         html_tree.rewrite_links(self._link_repl)
@@ -9,20 +9,25 @@
 #  - 2014-12-09: Updated by mlr to make the date range wider and more thorough.
 
 
-import os
 from datetime import date, timedelta
 
-import requests
 from lxml import html
-from selenium import webdriver
-from juriscraper.AbstractSite import logger
 from juriscraper.DeferringList import DeferringList
 from juriscraper.OpinionSite import OpinionSite
-from juriscraper.lib.cookie_utils import normalize_cookies
+from juriscraper.lib.browser_utils import browser_for
 from juriscraper.lib.string_utils import titlecase
 
 
 class Site(OpinionSite):
+    # One row per opinion or order, on every page of results.
+    row_path = "id('ctl00_ContentPlaceHolder1_grdDocuments_ctl00')" \
+               "//tr[contains(., 'Opinion') or contains(., 'Order')]"
+    row_fields = {
+        'download_urls': './td[4]//@href',
+        'docket_numbers': "./td[5]//text()[contains(., '-')]",
+        'case_name_urls': './td[5]//@href',
+    }
+
     def __init__(self):
         super(Site, self).__init__()
         self.court_id = self.__module__
@@ -43,82 +48,60 @@ class Site(OpinionSite):
             self.records_nr = len(html_tree_list[0].xpath("//tr[@class='rgRow' or @class='rgAltRow']"))
             return html_tree_list
         else:
-            logger.info("Running Selenium browser PhantomJS...")
-            driver = webdriver.PhantomJS(
-                executable_path='/usr/local/phantomjs/phantomjs',
-                service_log_path=os.path.devnull,  # Disable ghostdriver.log
-            )
-            driver.set_window_size(1920, 1080)
-            driver.get(self.url)
-
-            # Get a screenshot in testing
-            # driver.save_screenshot('out.png')
-
-            # Set the cookie
-            self.cookies = normalize_cookies(driver.get_cookies())
-
-            driver.implicitly_wait(10)
-            if self.court_name == 'sc':
-                # Supreme Court is checked by default, so we don't want to
-                # check it again.
-                pass
-            else:
-                search_court_type = driver.find_element_by_id("ctl00_ContentPlaceHolder1_chkListCourts_{court_nr}".format(
-                    court_nr=self.courts[self.court_name])
-                )
-                search_court_type.click()
-
-            search_opinions = driver.find_element_by_id("ctl00_ContentPlaceHolder1_chkListDocTypes_0")
-            search_opinions.click()
-
-            search_orders = driver.find_element_by_id("ctl00_ContentPlaceHolder1_chkListDocTypes_1")
-            search_orders.click()
-
-            start_date = driver.find_element_by_id("ctl00_ContentPlaceHolder1_dtDocumentFrom_dateInput")
-            start_date.send_keys((self.case_date - timedelta(days=5)).strftime("%m/%d/%Y"))
-
-            end_date = driver.find_element_by_id("ctl00_ContentPlaceHolder1_dtDocumentTo_dateInput")
-            end_date.send_keys(self.case_date.strftime("%m/%d/%Y"))
-            # driver.save_screenshot('out2.png')
-
-            submit = driver.find_element_by_id("ctl00_ContentPlaceHolder1_btnSearchText")
-            submit.click()
-            driver.implicitly_wait(20)
-            # driver.save_screenshot('out3.png')
-
-            nr_of_pages = driver.find_element_by_xpath(
-                '//thead//*[contains(concat(" ", normalize-space(@class), " "), " rgInfoPart ")]/strong[2]')
-            records_nr = driver.find_element_by_xpath(
-                '//thead//*[contains(concat(" ", normalize-space(@class), " "), " rgInfoPart ")]/strong[1]')
-            if records_nr:
-                self.records_nr = int(records_nr.text)
-            if nr_of_pages:
-                if nr_of_pages.text == '1':
-                    text = driver.page_source
-                    driver.close()
-
-                    html_tree = html.fromstring(text)
-                    html_tree.make_links_absolute(self.url)
-
-                    remove_anchors = lambda url: url.split('#')[0]
-                    html_tree.rewrite_links(remove_anchors)
-                    return html_tree
+            with browser_for(self) as driver:
+                driver.set_window_size(1920, 1080)
+                driver.get(self.url)
+
+                # Get a screenshot in testing
+                # driver.save_screenshot('out.png')
+
+                driver.implicitly_wait(10)
+                if self.court_name == 'sc':
+                    # Supreme Court is checked by default, so we don't want to
+                    # check it again.
+                    pass
                 else:
-                    html_pages = []
-                    text = driver.page_source
-
-                    html_tree = html.fromstring(text)
-                    html_tree.make_links_absolute(self.url)
-
-                    remove_anchors = lambda url: url.split('#')[0]
-                    html_tree.rewrite_links(remove_anchors)
-                    html_pages.append(html_tree)
+                    search_court_type = driver.find_element_by_id("ctl00_ContentPlaceHolder1_chkListCourts_{court_nr}".format(
+                        court_nr=self.courts[self.court_name])
+                    )
+                    search_court_type.click()
+
+                search_opinions = driver.find_element_by_id("ctl00_ContentPlaceHolder1_chkListDocTypes_0")
+                search_opinions.click()
+
+                search_orders = driver.find_element_by_id("ctl00_ContentPlaceHolder1_chkListDocTypes_1")
+                search_orders.click()
+
+                start_date = driver.find_element_by_id("ctl00_ContentPlaceHolder1_dtDocumentFrom_dateInput")
+                start_date.send_keys((self.case_date - timedelta(days=5)).strftime("%m/%d/%Y"))
+
+                end_date = driver.find_element_by_id("ctl00_ContentPlaceHolder1_dtDocumentTo_dateInput")
+                end_date.send_keys(self.case_date.strftime("%m/%d/%Y"))
+                # driver.save_screenshot('out2.png')
+
+                submit = driver.find_element_by_id("ctl00_ContentPlaceHolder1_btnSearchText")
+                submit.click()
+                driver.implicitly_wait(20)
+                # driver.save_screenshot('out3.png')
+
+                nr_of_pages = driver.find_element_by_xpath(
+                    '//thead//*[contains(concat(" ", normalize-space(@class), " "), " rgInfoPart ")]/strong[2]')
+                records_nr = driver.find_element_by_xpath(
+                    '//thead//*[contains(concat(" ", normalize-space(@class), " "), " rgInfoPart ")]/strong[1]')
+                if records_nr:
+                    self.records_nr = int(records_nr.text)
+                if nr_of_pages:
+                    if nr_of_pages.text == '1':
+                        text = driver.page_source
 
-                    for i in xrange(int(nr_of_pages.text) - 1):
-                        next_page = driver.find_element_by_class_name('rgPageNext')
-                        next_page.click()
-                        driver.implicitly_wait(5)
+                        html_tree = html.fromstring(text)
+                        html_tree.make_links_absolute(self.url)
 
+                        remove_anchors = lambda url: url.split('#')[0]
+                        html_tree.rewrite_links(remove_anchors)
+                        return html_tree
+                    else:
+                        html_pages = []
                         text = driver.page_source
 
                         html_tree = html.fromstring(text)
@@ -127,19 +110,28 @@ class Site(OpinionSite):
                         remove_anchors = lambda url: url.split('#')[0]
                         html_tree.rewrite_links(remove_anchors)
                         html_pages.append(html_tree)
-                    driver.close()
-                    return html_pages
+
+                        for i in xrange(int(nr_of_pages.text) - 1):
+                            next_page = driver.find_element_by_class_name('rgPageNext')
+                            next_page.click()
+                            driver.implicitly_wait(5)
+
+                            text = driver.page_source
+
+                            html_tree = html.fromstring(text)
+                            html_tree.make_links_absolute(self.url)
+
+                            remove_anchors = lambda url: url.split('#')[0]
+                            html_tree.rewrite_links(remove_anchors)
+                            html_pages.append(html_tree)
+                        return html_pages
 
     def _get_case_names(self):
         def fetcher(url):
             if self.method == 'LOCAL':
                 return "No case names fetched during tests."
             else:
-                r = requests.get(
-                    url,
-                    allow_redirects=True,
-                    headers={'User-Agent': 'Juriscraper'},
-                )
+                r = self._request('GET', url, allow_redirects=True)
                 r.raise_for_status()
 
                 html_tree = html.fromstring(r.text)
@@ -157,17 +149,10 @@ class Site(OpinionSite):
                 else:
                     return titlecase(plaintiff)
 
-        seed_urls = []
-        if isinstance(self.html, list):
-            for html_tree in self.html:
-                page_records_count = self._get_opinion_count(html_tree)
-                for record in xrange(page_records_count):
-                    path = "id('ctl00_ContentPlaceHolder1_grdDocuments_ctl00__{n}')/td[5]//@href".format(n=record)
-                    seed_urls.append(html_tree.xpath(path)[0])
-        else:
-            seed_urls = map(self._return_seed_url, range(self.records_nr))
+        seed_urls = self._columns['case_name_urls']
         if seed_urls:
-            return DeferringList(seed=seed_urls, fetcher=fetcher)
+            return DeferringList(seed=seed_urls, fetcher=fetcher,
+                                 max_workers=4)
         else:
             return []
 
@@ -176,47 +161,3 @@ class Site(OpinionSite):
 
     def _get_precedential_statuses(self):
         return ['Published'] * self.records_nr
-
-    def _get_download_urls(self):
-        if isinstance(self.html, list):
-            download_urls = []
-            for html_tree in self.html:
-                page_records_count = self._get_opinion_count(html_tree)
-                for record in xrange(page_records_count):
-                    path = "id('ctl00_ContentPlaceHolder1_grdDocuments_ctl00__{n}')/td[4]//@href".format(n=record)
-                    download_urls.append(html_tree.xpath(path)[0])
-            return download_urls
-        else:
-            return map(self._return_download_url, range(self.records_nr))
-
-    def _get_docket_numbers(self):
-        if isinstance(self.html, list):
-            docket_numbers = []
-            for html_tree in self.html:
-                page_records_count = self._get_opinion_count(html_tree)
-                for record in xrange(page_records_count):
-                    path = "id('ctl00_ContentPlaceHolder1_grdDocuments_ctl00__{n}')" \
-                           "/td[5]//text()[contains(., '-')]".format(n=record)
-                    docket_numbers.append(html_tree.xpath(path)[0])
-            return docket_numbers
-        else:
-            return map(self._return_docket_number, range(self.records_nr))
-
-    def _return_docket_number(self, record):
-        path = "id('ctl00_ContentPlaceHolder1_grdDocuments_ctl00__{n}')/td[5]//text()[contains(., '-')]".format(
-            n=record
-        )
-        return self.html.xpath(path)[0]
-
-    def _return_download_url(self, record):
-        path = "id('ctl00_ContentPlaceHolder1_grdDocuments_ctl00__{n}')/td[4]//@href".format(n=record)
-        return self.html.xpath(path)[0]
-
-    def _return_seed_url(self, record):
-        path = "id('ctl00_ContentPlaceHolder1_grdDocuments_ctl00__{n}')/td[5]//@href".format(n=record)
-        return self.html.xpath(path)[0]
-
-    @staticmethod
-    def _get_opinion_count(html_tree):
-        return int(html_tree.xpath("count(id('ctl00_ContentPlaceHolder1_grdDocuments_ctl00')"
-                                   "//tr[contains(., 'Opinion') or contains(., 'Order')])"))
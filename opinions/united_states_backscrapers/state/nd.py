@@ -2,13 +2,13 @@
 # Date created: 2013-06-06
 
 import re
-import requests
 
 from datetime import date
 from datetime import datetime
 
 from juriscraper.opinions.united_states.state import nd
 from juriscraper.DeferringList import DeferringList
+from juriscraper.lib.http_utils import get_session
 
 
 class Site(nd.Site):
@@ -26,9 +26,7 @@ class Site(nd.Site):
                 return html_link    # Can't fetch remote during tests
             case_number = re.search('(\d+)', html_link).group(0)
             wpd_link = 'http://www.ndcourts.gov/wp/%s.wpd' % case_number
-            r = requests.head(wpd_link,
-                              allow_redirects=False,
-                              headers={'User-Agent': 'Juriscraper'})
+            r = get_session(wpd_link).head(wpd_link, allow_redirects=False)
             if r.status_code == 200:
                 return wpd_link
             else:
@@ -41,7 +39,8 @@ class Site(nd.Site):
             path = '//ul//a[text()]/@href'
             seed = list(self.html.xpath(path))
         return DeferringList(seed=seed,
-                             fetcher=fetcher)
+                             fetcher=fetcher,
+                             max_workers=4)
 
     def _get_case_names(self):
         if self.crawl_date >= date(1998, 10, 1):
@@ -133,18 +132,8 @@ class Site(nd.Site):
     def _post_parse(self):
         # Remove any information that applies to non-appellate cases.
         if self.neutral_citations:
-            delete_items = []
-            for i in range(0, len(self.neutral_citations)):
-                if 'App' in self.neutral_citations[i]:
-                    delete_items.append(i)
-
-            for i in sorted(delete_items, reverse=True):
-                del self.download_urls[i]
-                del self.case_names[i]
-                del self.case_dates[i]
-                del self.precedential_statuses[i]
-                del self.docket_numbers[i]
-                del self.neutral_citations[i]
+            self.results.filter(
+                lambda row: 'App' not in row.neutral_citations)
         else:
             # When there aren't any neutral cites that means they're all supreme court cases.
             pass
@@ -4,9 +4,9 @@
 import re
 from datetime import datetime
 from lxml import html
-from selenium import webdriver
 from time import sleep
 from juriscraper.OpinionSite import OpinionSite
+from juriscraper.lib.browser_utils import browser_for
 from juriscraper.lib.string_utils import titlecase
 
 
@@ -180,14 +180,14 @@ class Site(OpinionSite):
 
     def _download_backwards(self, year):
         self.year = year
-        browser = webdriver.PhantomJS()
-        browser.get(self.url)
-        elems = browser.find_elements_by_class_name('igeb_ItemLabel')
-        elem = [elem for elem in elems if elem.text == str(year)][0]
-        elem.click()
-        sleep(5)
+        with browser_for(self) as browser:
+            browser.get(self.url)
+            elems = browser.find_elements_by_class_name('igeb_ItemLabel')
+            elem = [elem for elem in elems if elem.text == str(year)][0]
+            elem.click()
+            sleep(5)
 
-        text = browser.page_source
+            text = browser.page_source
         html_tree = html.fromstring(text)
         html_tree.make_links_absolute(self.url)
 
@@ -196,4 +196,3 @@ class Site(OpinionSite):
 
         self.html = html_tree
         self.status = 200
-        browser.quit()
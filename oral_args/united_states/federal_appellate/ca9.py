@@ -10,7 +10,6 @@ History:
 """
 from datetime import date, datetime
 
-import requests
 from lxml import html
 from juriscraper.AbstractSite import InsanityException
 from juriscraper.DeferringList import DeferringList
@@ -42,33 +41,23 @@ class Site(OralArgumentSite):
         For these items, we set the download_url to '' and this method finds
         the related information for those items and then removes it from all
         the other attributes for the Site object.
+
+        Finding them means reading every download URL, so the whole
+        DeferringList is fetched here, during parse(), on its worker threads.
         """
         # Start by checking sanity. This will make sure we don't mess things
         # up. If this sanity check fails, we'll know things were messed up
         # before we began tinkering with them.
         self._check_sanity()
 
-        # Items are purged in two steps. First, we identify the index of the
-        # items that need purging.
-        purge_indexes = []
-        for i, url in enumerate(self.download_urls):
-            if not url:
-                purge_indexes.append(i)
-
         # Quick check: We did find *some* urls, right?
-        if len(purge_indexes) == len(self.download_urls):
+        if not any(self.download_urls):
             raise InsanityException("Didn't get any download URLs. Looks like "
                                     "something is wrong in the _post_parse() "
                                     "method.")
 
-        # Second, we purge them, beginning at the end and moving forwards. This
-        # ensures that we don't delete the wrong items.
-        for index_to_purge in sorted(purge_indexes, reverse=True):
-            for attr in self._all_attrs:
-                item = getattr(self, attr)
-                if item is not None:
-                    # If we've added stuff to it, then delete the key.
-                    del item[index_to_purge]
+        # Purge the items without one from every attribute.
+        self.results.filter(lambda row: row.download_urls)
 
     def _get_download_urls(self):
         """Links from the root page go to a second page where the real links
@@ -79,11 +68,8 @@ class Site(OralArgumentSite):
                 return "No case names fetched during tests."
             else:
                 """Goes to second page, grabs the link and returns it."""
-                r = requests.get(
-                    seed_url,
-                    allow_redirects=False,
-                    headers={'User-Agent': 'Juriscraper'}
-                )
+                r = self._request('GET', seed_url,
+                                  allow_redirects=False)
                 r.raise_for_status()
                 html_tree = html.fromstring(r.text)
                 html_tree.make_links_absolute(self.url)
@@ -99,7 +85,10 @@ class Site(OralArgumentSite):
 
         path = "//tr[@class='dg_tr']/td[6]//@href"
         seed_urls = self.html.xpath(path)
-        return DeferringList(seed=seed_urls, fetcher=fetcher)
+        # Pages that can't be fetched get an empty URL, so they are purged in
+        # the _post_parse() method along with those lacking audio files.
+        return DeferringList(seed=seed_urls, fetcher=fetcher, max_workers=4,
+                             error_value='')
 
     def _get_download_urls_orig(self):
         """Note that the links from the root page go to a second page, where
@@ -8,7 +8,6 @@ Date created: 20 July 2014
 
 from datetime import datetime, date
 from lxml import html
-import requests
 from juriscraper.OralArgumentSite import OralArgumentSite
 
 
@@ -28,9 +27,8 @@ class Site(OralArgumentSite):
     def _get_download_urls(self):
         path = "//td[contains(concat(' ',@class,' '),' views-field-field-argument-value')][contains(., '/')]/preceding-sibling::td[2]/a/@href"
         download_urls = []
-        s = requests.session()
         for index, e in enumerate(self.html.xpath(path)):
-            case_html = self._get_case_page(e, s)
+            case_html = self._get_case_page(e)
             path = "//a[contains(concat(' ',@class,' '),' arg-link audio') and contains(., 'Download')]/@href"
             urls = list(case_html.xpath(path))
             if len(urls) == 0:
@@ -41,9 +39,8 @@ class Site(OralArgumentSite):
                 self.extender[index] = len(urls)
         return download_urls
 
-    def _get_case_page(self, url, session):
-        r = session.get(url,
-                  headers={'User-Agent': 'Juriscraper'})
+    def _get_case_page(self, url):
+        r = self._request('GET', url)
         r.raise_for_status()
 
         # If the encoding is iso-8859-1, switch it to cp1252 (a superset)
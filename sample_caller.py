@@ -1,10 +1,15 @@
+import os
 import signal
 import sys
 import traceback
 from optparse import OptionParser
 import urllib2
 
-from lib.importer import build_module_list, site_yielder
+from lib.backscraper import BackScrapeState, back_scrape
+from lib.cache_utils import ChangeCache, ResponseCache, SeenCache
+from lib.download_utils import download_binaries
+from lib.importer import build_module_list
+from lib.scheduler import scrape_courts
 
 
 
@@ -14,6 +19,11 @@ from lib.string_utils import trunc
 
 die_now = False
 
+# The hashes of every binary downloaded so far, so that files we already have
+# aren't processed again. With --seen-cache, this is the SeenCache, so they
+# are remembered between runs.
+known_hashes = set()
+
 
 def signal_handler(signal, frame):
     # Trigger this with CTRL+4
@@ -24,66 +34,81 @@ def signal_handler(signal, frame):
     die_now = True
 
 
-def extract_doc_content(data):
+def extract_doc_content(path):
     # Your data extraction routines here.
     pass
 
 
-def scrape_court(site, binaries=False):
+def scrape_court(site, binaries=False, workers=4):
     """Calls the requested court(s), gets its content, then throws it away.
 
     Note that this is a very basic caller lacking important functionality, such
-    as:
-     - checking whether the HTML of the page has changed since last visited
-     - checking whether the downloaded content is already in your data store
-     - saving anything at all
+    as saving anything at all. The --change-cache and --seen-cache options
+    stand in for checking your data store for pages and items you already
+    have.
 
     Nonetheless, this caller is useful for testing, and for demonstrating some
     basic pitfalls that a caller will run into.
     """
-    for i in range(0, len(site.case_names)):
-        # Percent encode URLs (this is a Python wart)
-        download_url = urllib2.quote(site.download_urls[i], safe="%/:=&?~#+!$,;'@()*[]")
-
-        if binaries:
-            try:
-                opener = urllib2.build_opener()
-                for cookie_dict in site.cookies:
-                    opener.addheaders.append(("Cookie", "%s=%s" % (cookie_dict['name'], cookie_dict['value'])))
-                data = opener.open(download_url).read()
-                # test for empty files (thank you CA1)
-                if len(data) == 0:
-                    v_print(3, 'EmptyFileError: %s' % download_url)
-                    v_print(3, traceback.format_exc())
-                    continue
-            except Exception:
-                v_print(3, 'DownloadingError: %s' % download_url)
-                v_print(3, traceback.format_exc())
+    # Percent encode URLs (this is a Python wart)
+    download_urls = [urllib2.quote(url, safe="%/:=&?~#+!$,;'@()*[]")
+                     for url in site.download_urls]
+
+    failed = set()
+    if binaries:
+        # Files are streamed to temporary files on disk, so even big audio
+        # files are never held in memory.
+        for i, result, error in download_binaries(site, download_urls,
+                                                  max_workers=workers,
+                                                  known_hashes=known_hashes):
+            if error:
+                v_print(3, 'DownloadingError: %s' % download_urls[i])
+                v_print(3, error)
+                failed.add(i)
                 continue
+            if result.known:
+                v_print(3, 'Already have the file at: %s' % download_urls[i])
+                continue
+            known_hashes.add(result.sha1)
+            try:
+                # Extract the data using e.g. antiword, pdftotext, etc.
+                extract_doc_content(result.path)
+            finally:
+                os.remove(result.path)
 
-            # Clean the data, then extract it using e.g. antiword, pdftotext, etc.
-            data = site._cleanup_content(data)
-            extract_doc_content(data)
+    for i, row in enumerate(site.results):
+        if i in failed:
+            continue
+        download_url = download_urls[i]
 
         # Normally, you'd do your save routines here...
         v_print(1, 'Adding new document found at: %s' % download_url)
-        attributes = site._all_attrs
-        for attr in attributes:
-            if getattr(site, attr) is not None:
-                value = getattr(site, attr)[i]
-                if type(value) == unicode:
-                    value = trunc(value, 200, ellipsis='...')
-                    v_print(1, '    %s: "%s"' % (attr, value.encode('utf-8')))
-                else:
-                    # Dates and such...
-                    v_print(1, '    %s: %s' % (attr, value))
+        for attr, value in row.items():
+            if type(value) == unicode:
+                value = trunc(value, 200, ellipsis='...')
+                v_print(1, '    %s: "%s"' % (attr, value.encode('utf-8')))
+            else:
+                # Dates and such...
+                v_print(1, '    %s: %s' % (attr, value))
+
+    if site.seen_cache is not None:
+        # Only now that the items are handled are they marked as seen.
+        site.seen_cache.add_site(site, skip=failed)
 
+    v_print(2, '%s: Parse stats: %s' % (site.court_id, site.stats))
     v_print(3, '%s: Successfully crawled.' % site.court_id)
 
 
+def report_crawler_down(module_string, tb):
+    v_print(3, '*************!! CRAWLER DOWN !!****************')
+    v_print(3, '*****scrape_court method failed on mod: %s*****' % module_string)
+    v_print(3, '*************!! ACTION NEEDED !!***************')
+    v_print(3, tb)
+
+
 v_print = None
 def main():
-    global die_now
+    global die_now, known_hashes
 
     # this line is used for handling SIGTERM (CTRL+4), so things can die safely
     signal.signal(signal.SIGTERM, signal_handler)
@@ -121,6 +146,67 @@ def main():
                       action='store_true',
                       default=False,
                       help='Download the historical corpus using the _download_backwards method.')
+    parser.add_option('--backscrape-state',
+                      dest='backscrape_state',
+                      metavar='PATH',
+                      default=None,
+                      help='Record the progress of back-scrapes in this file, '
+                           'so that they resume where they left off.')
+    parser.add_option('--backscrape-workers',
+                      dest='backscrape_workers',
+                      type='int',
+                      default=2,
+                      help='The number of pages of a back-scrape to download '
+                           'at the same time (default: 2).')
+    parser.add_option('--incremental',
+                      dest='incremental',
+                      action='store_true',
+                      default=False,
+                      help='Stop a back-scrape at the first page with nothing '
+                           'new in the --seen-cache.')
+    parser.add_option('-w',
+                      '--workers',
+                      dest='workers',
+                      type='int',
+                      default=8,
+                      help='The number of courts to scrape at the same time.')
+    parser.add_option('--per-host',
+                      dest='per_host',
+                      type='int',
+                      default=2,
+                      help='The number of courts to scrape at the same time '
+                           'from any single host.')
+    parser.add_option('-t',
+                      '--timeout',
+                      dest='timeout',
+                      type='int',
+                      default=None,
+                      help='Give up on a court if it takes more than this '
+                           'many seconds to scrape.')
+    parser.add_option('--download-workers',
+                      dest='download_workers',
+                      type='int',
+                      default=4,
+                      help='The number of binaries to download at once from '
+                           'each court (default: 4).')
+    parser.add_option('--change-cache',
+                      dest='change_cache',
+                      metavar='PATH',
+                      default=None,
+                      help='Remember the pages of each court in this file, '
+                           'and skip parsing pages that have not changed.')
+    parser.add_option('--response-cache',
+                      dest='response_cache',
+                      metavar='PATH',
+                      default=None,
+                      help='Cache the secondary pages that courts link to '
+                           '(e.g., case detail pages) in this file.')
+    parser.add_option('--seen-cache',
+                      dest='seen_cache',
+                      metavar='PATH',
+                      default=None,
+                      help='Remember the items and binaries handled in this '
+                           'file, and skip them when they are seen again.')
 
     (options, args) = parser.parse_args()
 
@@ -149,44 +235,90 @@ def main():
         if len(module_strings) == 0:
             parser.error('Unable to import module or package. Aborting.')
 
-        v_print(3, 'Starting up the scraper.')
-        num_courts = len(module_strings)
-        i = 0
-        while i < num_courts:
-            # this catches SIGINT, so the code can be killed safely.
-            if die_now:
-                v_print(3, 'The scraper has stopped.')
-                sys.exit(1)
-
-            package, module = module_strings[i].rsplit('.', 1)
-            v_print(3, "Current court: %s.%s" % (package, module))
-
-            mod = __import__("%s.%s" % (package, module),
-                             globals(),
-                             locals(),
-                             [module])
-            try:
-                if backscrape:
-                    for site in site_yielder(mod.Site().back_scrape_iterable, mod):
-                        site.parse()
-                        scrape_court(site, binaries)
-                else:
-                    site = mod.Site()
-                    site.parse()
-                    scrape_court(site, binaries)
-            except Exception:
-                v_print(3, '*************!! CRAWLER DOWN !!****************')
-                v_print(3, '*****scrape_court method failed on mod: %s*****' % module_strings[i])
-                v_print(3, '*************!! ACTION NEEDED !!***************')
-                v_print(3, traceback.format_exc())
-                i += 1
-                continue
+        seen_cache = None
+        if options.seen_cache:
+            seen_cache = SeenCache(options.seen_cache)
+            known_hashes = seen_cache
+        if options.incremental and not seen_cache:
+            parser.error('--incremental needs a --seen-cache.')
 
-            last_court_in_list = (i == (num_courts - 1))
-            if last_court_in_list and daemon_mode:
-                i = 0
-            else:
-                i += 1
+        v_print(3, 'Starting up the scraper.')
+        if backscrape:
+            state = None
+            if options.backscrape_state:
+                state = BackScrapeState(options.backscrape_state)
+
+            def setup(site):
+                site.seen_cache = seen_cache
+
+            for module_string in module_strings:
+                # this catches SIGINT, so the code can be killed safely.
+                if die_now:
+                    v_print(3, 'The scraper has stopped.')
+                    sys.exit(1)
+
+                v_print(3, "Current court: %s" % module_string)
+                try:
+                    for item, site, error in back_scrape(
+                            module_string,
+                            state=state,
+                            max_workers=options.backscrape_workers,
+                            setup=setup,
+                            seen=seen_cache if options.incremental else None):
+                        # Items are checkpointed when we come back for the
+                        # next one, so it's safe to stop here.
+                        if die_now:
+                            v_print(3, 'The scraper has stopped.')
+                            sys.exit(1)
+                        if error:
+                            report_crawler_down(module_string, error)
+                            continue
+                        scrape_court(site, binaries, options.download_workers)
+                except Exception:
+                    report_crawler_down(module_string, traceback.format_exc())
+            if state is not None:
+                state.close()
+        else:
+            change_cache = None
+            if options.change_cache:
+                change_cache = ChangeCache(options.change_cache)
+            response_cache = None
+            if options.response_cache:
+                response_cache = ResponseCache(options.response_cache)
+
+            def setup(site):
+                site.change_cache = change_cache
+                site.response_cache = response_cache
+                site.seen_cache = seen_cache
+
+            while True:
+                # Courts are handed back as they finish, so one slow court
+                # doesn't hold up all the others.
+                for module_string, site, error in scrape_courts(
+                        module_strings,
+                        max_workers=options.workers,
+                        max_per_host=options.per_host,
+                        timeout=options.timeout,
+                        setup=setup):
+                    # this catches SIGINT, so the code can be killed safely.
+                    if die_now:
+                        v_print(3, 'The scraper has stopped.')
+                        sys.exit(1)
+
+                    v_print(3, "Current court: %s" % module_string)
+                    if error:
+                        report_crawler_down(module_string, error)
+                        continue
+                    if site.unchanged:
+                        v_print(3, '%s: Unchanged since last time.' % module_string)
+                        continue
+                    try:
+                        scrape_court(site, binaries, options.download_workers)
+                    except Exception:
+                        report_crawler_down(module_string, traceback.format_exc())
+
+                if not daemon_mode:
+                    break
 
     v_print(3, 'The scraper has stopped.')
     sys.exit(0)
@@ -4,22 +4,34 @@ from requests.models import Request, Response
 from requests.exceptions import ConnectionError
 
 
+class StreamedFile(file):
+    """A file that Response.close() closes, just as it releases the
+    connection of a real streamed response.
+    """
+    def release_conn(self):
+        self.close()
+
+
 class MockRequest(Request):
     def __init__(self, url=None):
         super(Request, self).__init__()
         self.url = url
 
-    def get(self):
+    def get(self, stream=False):
         r = Response()
         try:
-            r._content = open(self.url).read()
+            if stream:
+                # Read lazily, as requests does with stream=True.
+                r.raw = StreamedFile(self.url, 'rb')
+            else:
+                r._content = open(self.url).read()
             #: Integer Code of responded HTTP Status.
             r.status_code = 200
         except IOError as e:
             r.status_code = 404
             raise ConnectionError(e)
 
-        r._content_consumed = True
+        r._content_consumed = not stream
 
         #: Final URL location of Response.
         r.url = self.url
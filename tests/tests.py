@@ -3,23 +3,60 @@
 
 import datetime
 import glob
+import hashlib
+import io
+import json
 import logging
 import os
+import shutil
+import StringIO
+import tempfile
 import time
+import types
 import unittest
 import sys
 
+from lxml import html
+from requests.adapters import HTTPAdapter
+from requests.cookies import cookiejar_from_dict
+from requests.models import Response
+
+from juriscraper.AbstractSite import AbstractSite, DeferredFileHandler
+from juriscraper.DeferringList import DeferringList
+from juriscraper.OpinionSite import OpinionSite
+from juriscraper.lib.backscraper import BackScrapeState, back_scrape
+from juriscraper.lib.browser_utils import BrowserPool, \
+    BrowserPoolTimeoutException
+from juriscraper.lib.cache_utils import (BloomFilter, ChangeCache,
+                                         ResponseCache, SeenCache)
 from juriscraper.lib.importer import build_module_list
+from juriscraper.lib.scheduler import scrape_courts
+from juriscraper.lib.download_utils import (EmptyFileException,
+                                            download_binaries,
+                                            download_binary)
 from juriscraper.lib.date_utils import parse_dates, quarter, \
-    is_first_month_in_quarter
-from juriscraper.lib.string_utils import clean_string
+    is_first_month_in_quarter, parse_date, parse_date_column, \
+    _learned_formats
+from juriscraper.lib.http_utils import (RateLimiter, close_sessions,
+                                        configure_rate_limits,
+                                        get_rate_limiter, get_session)
+from juriscraper.tests import MockRequest
+from juriscraper.lib.string_utils import clean_string, clean_strings
 from juriscraper.lib.string_utils import fix_camel_case
 from juriscraper.lib.string_utils import force_unicode
-from juriscraper.lib.string_utils import harmonize
-from juriscraper.lib.string_utils import titlecase
-from juriscraper.opinions.united_states.state import massappct, pa, mass, nh
+from juriscraper.lib.string_utils import harmonize, harmonize_strings
+from juriscraper.lib.string_utils import titlecase, titlecase_strings
+from juriscraper.lib.xpath_utils import cache_info, xpath
+from juriscraper.opinions.united_states.state import massappct, pa, mass, nh, \
+    idaho_civil, nyappdiv_2nd
+from juriscraper.opinions.united_states.federal_appellate import ca1
 from juriscraper.oral_args.united_states.federal_appellate import ca6
 
+# Computed up front, since some tests change the working directory.
+CA1_EXAMPLE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    '../opinions/united_states/federal_appellate/ca1_example.xml')
+
 
 class SlownessException(Exception):
     def __init__(self, message):
@@ -49,6 +86,26 @@ class DateParserTest(unittest.TestCase):
             dates = parse_dates(pair[0])
             self.assertEqual(dates, pair[1])
 
+    def test_parse_date_learns_formats(self):
+        key = ('test', 'case_dates')
+        self.assertEqual(parse_date('Jan 5, 2015', key=key),
+                         datetime.datetime(2015, 1, 5))
+        self.assertEqual(_learned_formats[key], '%b %d, %Y')
+        # Strings that no format fits fall back to parse_dates.
+        self.assertEqual(parse_date_column(['Jan 6, 2015', 'Jan. 7th, 2015'],
+                                           key=key),
+                         [datetime.date(2015, 1, 6),
+                          datetime.date(2015, 1, 7)])
+        self.assertRaises(ValueError, parse_date, 'nothing', key=key,
+                          fallback=False)
+
+    def test_parse_date_with_a_list_of_formats(self):
+        learned = dict(_learned_formats)
+        self.assertEqual(parse_date('2014-01-02', formats=['%Y-%m-%d']),
+                         datetime.datetime(2014, 1, 2))
+        # Without a key, nothing is shared between callers.
+        self.assertEqual(_learned_formats, learned)
+
 
 class ScraperExampleTest(unittest.TestCase):
     def setUp(self):
@@ -307,6 +364,15 @@ class StringUtilTest(unittest.TestCase):
         for pair in test_pairs:
             self.assertEqual(harmonize(clean_string(pair[0])), pair[1])
 
+        # The batch functions must give the same results, including when
+        # they come from the memo the second time around.
+        inputs = [pair[0] for pair in test_pairs]
+        expected = [pair[1] for pair in test_pairs]
+        for _ in range(2):
+            self.assertEqual(harmonize_strings(clean_strings(inputs)),
+                             expected)
+        self.assertEqual(clean_strings([None, 5, ' a ']), [None, 5, u'a'])
+
     def test_titlecase(self):
         """Tests various inputs for the titlecase function"""
         test_pairs = [
@@ -386,6 +452,25 @@ class StringUtilTest(unittest.TestCase):
             self.assertEqual(titlecase(force_unicode(pair[0])),
                              pair[1])
 
+        inputs = [force_unicode(pair[0]) for pair in test_pairs]
+        for _ in range(2):
+            self.assertEqual(titlecase_strings(inputs),
+                             [pair[1] for pair in test_pairs])
+
+    def test_clean_text(self):
+        """Does _clean_text make each of its fixes, and only when needed?"""
+        clean_text = AbstractSite()._clean_text
+        test_pairs = (
+            (u'  <?xml version="1.0" encoding="utf-8"?>\n<rss></rss>',
+             u'\n<rss></rss>'),
+            (u'<p><![CDATA[Foo]]></br>bar</p>', u'<p>Foo<br/>bar</p>'),
+            (u'a\x00b\x1f\tc\ufffe\U0001f600d\u2019', u'ab\tcd\u2019'),
+            ('<p>\x0cfoo</br></p>', '<p>foo<br/></p>'),
+            (u'<p>Plain \ufeff text</p>', u'<p>Plain \ufeff text</p>'),
+        )
+        for text, expected in test_pairs:
+            self.assertEqual(clean_text(text), expected)
+
     def test_fixing_camel_case(self):
         """Can we correctly identify and fix camelCase?"""
         test_pairs = (
@@ -432,6 +517,60 @@ class StringUtilTest(unittest.TestCase):
             self.assertEqual(pair[1], fix_camel_case(pair[0]))
 
 
+class ImporterTest(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        sys.path.insert(0, self.path)
+
+    def tearDown(self):
+        sys.path.remove(self.path)
+        for name in sys.modules.keys():
+            if name.startswith('importer_test_courts'):
+                del sys.modules[name]
+        shutil.rmtree(self.path)
+
+    def import_walk(self, court_id):
+        """The import-based walk that build_module_list used to do."""
+        try:
+            all_attr = __import__(court_id, globals(), locals(),
+                                  ['*']).__all__
+        except AttributeError:
+            return [court_id]
+        module_strings = []
+        for item in all_attr:
+            module_strings.extend(self.import_walk('%s.%s' % (court_id,
+                                                              item)))
+        return module_strings
+
+    def test_matches_an_import_based_walk(self):
+        module_strings = build_module_list('juriscraper')
+        self.assertEqual(module_strings, self.import_walk('juriscraper'))
+        self.assertEqual(
+            build_module_list('juriscraper.opinions.united_states.state.mass'),
+            ['juriscraper.opinions.united_states.state.mass'])
+
+    def test_dynamic_all_and_missing_modules(self):
+        package = os.path.join(self.path, 'importer_test_courts')
+        os.mkdir(package)
+        with open(os.path.join(package, '__init__.py'), 'w') as f:
+            f.write("__all__ = ['court_%s' % i for i in range(2)]\n")
+        for name in ('court_0', 'court_1'):
+            open(os.path.join(package, '%s.py' % name), 'w').close()
+        self.assertEqual(build_module_list('importer_test_courts'),
+                         ['importer_test_courts.court_0',
+                          'importer_test_courts.court_1'])
+
+        stdout = sys.stdout
+        sys.stdout = StringIO.StringIO()
+        try:
+            module_strings = build_module_list('importer_test_courts.nope')
+            output = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+        self.assertEqual(module_strings, [])
+        self.assertIn('Import error', output)
+
+
 class ScraperSpotTest(unittest.TestCase):
     """Adds specific tests to specific courts that are more-easily tested
     without a full integration test.
@@ -576,5 +715,836 @@ class ScraperSpotTest(unittest.TestCase):
             except AttributeError:
                 self.fail("Unable to parse ca6 string: '{s}'".format(s=test))
 
+
+class DeferringListTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    @staticmethod
+    def fetcher(seed):
+        if seed == 3:
+            raise ValueError('Unable to fetch seed 3.')
+        return seed * 10
+
+    def test_prefetching_keeps_order_and_records_errors(self):
+        deferring_list = DeferringList(seed=range(10), fetcher=self.fetcher,
+                                       max_workers=4, error_value=None)
+        self.assertEqual(list(deferring_list),
+                         [0, 10, 20, None, 40, 50, 60, 70, 80, 90])
+        self.assertEqual(deferring_list.errors.keys(), [3])
+
+    def test_prefetching_raises_errors_without_error_value(self):
+        deferring_list = DeferringList(seed=range(10), fetcher=self.fetcher,
+                                       max_workers=4, window=2)
+        self.assertEqual(deferring_list[9], 90)
+        self.assertRaises(ValueError, lambda: deferring_list[3])
+
+    def test_apply_and_permute_without_fetching(self):
+        fetched = []
+
+        def fetcher(seed):
+            fetched.append(seed)
+            return seed * 10
+
+        deferring_list = DeferringList(seed=range(4), fetcher=fetcher)
+        deferring_list.apply(lambda value: value + 1)
+        deferring_list.permute([3, 1, 2, 0])
+        self.assertEqual(fetched, [])
+        self.assertEqual(list(deferring_list), [31, 11, 21, 1])
+
+    def test_slicing(self):
+        deferring_list = DeferringList(seed=range(6), fetcher=self.fetcher,
+                                       max_workers=2, error_value=None)
+        self.assertEqual(deferring_list[0:2], [0, 10])
+        self.assertEqual(deferring_list[-2:], [40, 50])
+        self.assertEqual(deferring_list[::2], [0, 20, 40])
+        self.assertEqual(deferring_list[5:1], [])
+
+
+class ChangeCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.change_cache = ChangeCache(os.path.join(self.cache_dir, 'db'))
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        logging.disable(logging.NOTSET)
+
+    def make_site(self):
+        site = ca1.Site()
+        site.url = CA1_EXAMPLE
+        site.method = 'LOCAL'
+        site.change_cache = self.change_cache
+        return site
+
+    def test_identical_page_is_not_parsed_again(self):
+        first = self.make_site().parse()
+        self.assertFalse(first.unchanged)
+        self.assertTrue(first.case_names)
+
+        second = self.make_site().parse()
+        self.assertTrue(second.unchanged)
+        self.assertEqual(second.case_names, [])
+        self.assertEqual(second.hash, first.hash)
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.path = CA1_EXAMPLE
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_expiry_and_eviction(self):
+        r = MockRequest(url=self.path).get()
+        cache = ResponseCache(os.path.join(self.cache_dir, 'db'),
+                              max_size=len(r.content) * 2)
+        cache.set('a', r)
+        cached = cache.get('a')
+        self.assertEqual(cached.content, r.content)
+        self.assertEqual(cached.status_code, r.status_code)
+
+        cache.set('expired', r, ttl=-1)
+        self.assertIsNone(cache.get('expired'))
+
+        # 'b' is now the least recently used, so it's evicted to make room.
+        cache.set('b', r)
+        cache.get('a')
+        cache.set('c', r)
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        # The running total matches what is on disk.
+        self.assertEqual(cache._size, len(r.content) * 2)
+        self.assertEqual(ResponseCache(cache.path)._size, cache._size)
+
+
+class SeenCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.cache_dir, 'db')
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        logging.disable(logging.NOTSET)
+
+    def make_site(self, seen_cache):
+        site = ca1.Site()
+        site.url = CA1_EXAMPLE
+        site.method = 'LOCAL'
+        site.seen_cache = seen_cache
+        return site.parse()
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add('key %s' % i)
+        self.assertTrue(all('key %s' % i in bloom for i in range(1000)))
+        false_positives = sum('other %s' % i in bloom for i in range(1000))
+        self.assertLess(false_positives, 50)
+
+    def test_seen_items_are_dropped(self):
+        first = self.make_site(SeenCache(self.path))
+        count = len(first.case_names)
+        self.assertTrue(count)
+        # Nothing is marked as seen until the caller says so.
+        first.seen_cache.add_site(first, skip={0, 1})
+        first.seen_cache.add('a' * 40)
+
+        # Reopened, the cache is loaded from the database.
+        second = self.make_site(SeenCache(self.path))
+        self.assertEqual(len(second.case_names), 2)
+        self.assertEqual(second.case_names, first.case_names[:2])
+        self.assertEqual(second.hash, first.hash)
+        self.assertIn('a' * 40, second.seen_cache)
+        self.assertNotIn('b' * 40, second.seen_cache)
+
+
+class BackScrapeTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.attempts = []
+        path = CA1_EXAMPLE
+        attempts = self.attempts
+
+        class Site(ca1.Site):
+            def __init__(self):
+                super(Site, self).__init__()
+                self.back_scrape_iterable = range(4)
+
+            def _download_backwards(self, item):
+                attempts.append(item)
+                if item == 2 and attempts.count(2) == 1:
+                    raise Exception('Flaky court')
+                self.url = path
+                self.method = 'LOCAL'
+                self.html = self._download()
+
+        mod = types.ModuleType('juriscraper.tests.backscrape_court')
+        mod.Site = Site
+        sys.modules[mod.__name__] = mod
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        del sys.modules['juriscraper.tests.backscrape_court']
+        shutil.rmtree(self.state_dir)
+        logging.disable(logging.NOTSET)
+
+    def test_resumes_and_retries(self):
+        module_string = 'juriscraper.tests.backscrape_court'
+        state_path = os.path.join(self.state_dir, 'state.json')
+        results = back_scrape(module_string,
+                              state=BackScrapeState(state_path),
+                              max_workers=2, backoff=0)
+        item, site, error = next(results)
+        self.assertIsNone(error)
+        self.assertTrue(site.case_names)
+        # Stop the run after the second item, before it is marked done.
+        next(results)
+        results.close()
+
+        state = BackScrapeState(state_path)
+        finished = [item for item in range(4)
+                    if state.is_done(module_string, item)]
+        self.assertEqual(len(finished), 1)
+        del self.attempts[:]
+        items = [item for item, site, error in
+                 back_scrape(module_string, state=state, backoff=0)]
+        self.assertEqual(sorted(items + finished), range(4))
+        self.assertEqual(state.failed(module_string), {})
+
+    def test_state_journal_is_replayed_and_compacted(self):
+        state_path = os.path.join(self.state_dir, 'state.json')
+        state = BackScrapeState(state_path)
+        state.min_journal_size = 3
+        state.mark_failed('court', 1, 'Flaky court')
+        state.mark_done('court', 2)
+        self.assertFalse(os.path.exists(state_path))
+        # A crash partway through writing a line loses only that line.
+        with open(state.journal_path, 'a') as f:
+            f.write('["done", "cou')
+
+        state = BackScrapeState(state_path)
+        state.min_journal_size = 4
+        self.assertTrue(state.is_done('court', 2))
+        self.assertEqual(state.failed('court'), {'1': 'Flaky court'})
+        state.mark_done('court', 3)
+        self.assertTrue(BackScrapeState(state_path).is_done('court', 3))
+        state.mark_done('court', 1)
+        # The journal was long enough to be written out to the state file.
+        self.assertFalse(os.path.exists(state.journal_path))
+        with open(state_path) as f:
+            self.assertEqual(json.load(f),
+                             {'court': {'done': ['1', '2', '3'],
+                                        'failed': {}}})
+
+    def test_incremental_stops_at_known_items(self):
+        # Every page is the same, so the second has nothing new.
+        seen = set()
+        items = []
+        for item, site, error in back_scrape(
+                'juriscraper.tests.backscrape_court', backoff=0, seen=seen):
+            items.append(item)
+            seen.update(SeenCache.item_keys(site))
+        self.assertEqual(items, [0, 1])
+
+
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.started = []
+        self.module_strings = []
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        for module_string in self.module_strings:
+            sys.modules.pop(module_string, None)
+        logging.disable(logging.NOTSET)
+
+    def add_court(self, name, host, delay=0, broken=False):
+        """Registers a stub court module that sleeps for delay seconds
+        before parsing the ca1 example.
+        """
+        path = CA1_EXAMPLE
+        started = self.started
+
+        class Site(ca1.Site):
+            def __init__(self):
+                if broken:
+                    raise Exception('Broken court')
+                super(Site, self).__init__()
+                self.url = 'http://%s/opinions/' % host
+
+            def parse(self):
+                started.append(name)
+                time.sleep(delay)
+                self.url = path
+                return super(Site, self).parse()
+
+        module_string = 'juriscraper.tests.%s' % name
+        mod = types.ModuleType(module_string)
+        mod.Site = Site
+        sys.modules[module_string] = mod
+        self.module_strings.append(module_string)
+        return module_string
+
+    def test_courts_sharing_a_host_wait_their_turn(self):
+        modules = [self.add_court('same_1', 'same.example.com', delay=0.2),
+                   self.add_court('same_2', 'same.example.com', delay=0.2),
+                   self.add_court('other', 'other.example.com')]
+        results = list(scrape_courts(modules, max_workers=2, max_per_host=1,
+                                     method='LOCAL'))
+        # The other court skips past the saturated host and finishes first.
+        self.assertEqual(sorted(self.started[:2]), ['other', 'same_1'])
+        self.assertEqual(self.started[2], 'same_2')
+        self.assertEqual([module_string for module_string, _, _ in results],
+                         [modules[2], modules[0], modules[1]])
+        for module_string, site, error in results:
+            self.assertIsNone(error)
+            self.assertEqual(site.method, 'LOCAL')
+            self.assertTrue(site.case_names)
+
+    def test_broken_and_slow_courts_are_yielded_with_errors(self):
+        slow = self.add_court('slow', 'slow.example.com', delay=1)
+        broken = self.add_court('broken', 'broken.example.com', broken=True)
+        quick = self.add_court('quick', 'quick.example.com')
+        missing = 'juriscraper.tests.no_such_court'
+        start = time.time()
+        results = list(scrape_courts([slow, broken, missing, quick],
+                                     timeout=0.3, method='LOCAL'))
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual([module_string for module_string, _, _ in results],
+                         [broken, missing, quick, slow])
+        errors = dict((module_string, error)
+                      for module_string, _, error in results)
+        self.assertIn('Broken court', errors[broken])
+        self.assertIn('ImportError', errors[missing])
+        self.assertIsNone(errors[quick])
+        self.assertIn('CourtTimeoutException', errors[slow])
+
+
+class SiteStatsTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_parse_records_stats(self):
+        path = CA1_EXAMPLE
+        sunk = []
+        site = ca1.Site()
+        site.url = path
+        site.method = 'LOCAL'
+        site.stats_sink = sunk.append
+        site.parse()
+
+        self.assertEqual(sunk, [site])
+        self.assertEqual(site.stats.bytes_downloaded, os.path.getsize(path))
+        for stage in ('parse', '_download', '_get_case_names',
+                      '_clean_attributes', '_make_hash'):
+            self.assertEqual(site.stats.counts[stage], 1)
+        self.assertEqual(site.stats.deferred_fetches, 0)
+
+    def test_deferred_fetches_are_counted_when_they_happen(self):
+        class Site(ca1.Site):
+            def _get_docket_numbers(self):
+                seed = range(len(self.case_names))
+                docket_numbers = DeferringList(seed=seed,
+                                               fetcher=lambda i: 'No. %s' % i)
+                # One value is fetched before parse() sees the list.
+                docket_numbers[0]
+                return docket_numbers
+
+        site = Site()
+        site.url = CA1_EXAMPLE
+        site.method = 'LOCAL'
+        site.parse()
+        self.assertEqual(site.stats.deferred_fetches, 1)
+        list(site.docket_numbers)
+        count = len(site.case_names)
+        self.assertEqual(site.stats.deferred_fetches, count)
+        self.assertEqual(site.stats.counts['deferred_fetch'], count)
+
+
+class FakeBrowser(object):
+    def __init__(self):
+        self.crashed = False
+        self.quit_called = False
+
+    def set_page_load_timeout(self, seconds):
+        pass
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def delete_all_cookies(self):
+        if self.crashed:
+            raise Exception('Browser crashed')
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+class BrowserPoolTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_reuse_and_recycling(self):
+        pool = BrowserPool(max_instances=1, max_uses=2, timeout=0.1,
+                           factory=FakeBrowser)
+        with pool.lease() as first:
+            # The only browser is leased, so there's none to give out.
+            self.assertRaises(BrowserPoolTimeoutException,
+                              pool.lease().__enter__)
+        with pool.lease() as second:
+            self.assertIs(second, first)
+        # Recycled after two uses.
+        self.assertTrue(first.quit_called)
+
+        with pool.lease() as third:
+            self.assertIsNot(third, first)
+            third.crashed = True
+        self.assertTrue(third.quit_called)
+        with pool.lease() as fourth:
+            self.assertIsNot(fourth, third)
+
+
+class XPathCacheTest(unittest.TestCase):
+    def test_cached_xpath_matches_lxml(self):
+        tree = html.fromstring('<div><a href="/a1">1</a><a href="/b2">2</a>'
+                               '</div>')
+        path = '//a[re:test(@href, "[0-9]$")]/@href'
+        hits = cache_info()['hits']
+        self.assertEqual(xpath(tree, path), tree.xpath(
+            path, namespaces={'re': 'http://exslt.org/regular-expressions'}))
+        self.assertEqual(xpath(tree, path), ['/a1', '/b2'])
+        self.assertEqual(cache_info()['hits'], hits + 1)
+        self.assertEqual(xpath(tree, '//a[$n]/text()', n=2), ['2'])
+
+
+class RowExtractionTest(unittest.TestCase):
+    ROWS = """<html><body><table>
+        <tr><td><a href="/a.pdf">Foo v. Bar</a></td><td>01/02/2015</td></tr>
+        <tr><td>No opinion yet</td><td>01/03/2015</td></tr>
+        <tr><td><a href="/b.pdf">Baz v. Qux</a></td><td>01/04/2015</td>
+            <td>Judge Smith</td></tr>
+    </table></body></html>"""
+
+    def setUp(self):
+        class Site(OpinionSite):
+            row_path = '//tr'
+
+            def __init__(self):
+                super(Site, self).__init__()
+                self.court_id = 'test'
+                self.row_fields = {
+                    'download_urls': './td[1]/a/@href',
+                    'case_names': './td[1]/a/text()',
+                    'case_dates': self._return_case_date,
+                    'judges': './td[3]/text()',
+                }
+
+            def _keep_row(self, row):
+                return bool(row.xpath('./td[1]/a'))
+
+            @staticmethod
+            def _return_case_date(row):
+                return datetime.datetime.strptime(
+                    row.xpath('./td[2]/text()')[0], '%m/%d/%Y').date()
+
+            def _get_precedential_statuses(self):
+                return ['Published'] * len(self._rows)
+
+        self.cache_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.cache_dir, 'rows.html')
+        with open(self.path, 'w') as f:
+            f.write(self.ROWS)
+        self.site = Site()
+        self.site.url = self.path
+        self.site.method = 'LOCAL'
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        logging.disable(logging.NOTSET)
+
+    def test_columns_skip_rows_and_fill_missing_fields(self):
+        self.site.html = html.fromstring(self.ROWS)
+        self.site._extract_rows()
+        columns = self.site._columns
+        self.assertEqual(len(self.site._rows), 2)
+        self.assertEqual(columns['case_names'], ['Foo v. Bar', 'Baz v. Qux'])
+        self.assertEqual(columns['judges'], [None, 'Judge Smith'])
+        self.assertEqual(set(len(column) for column in columns.values()),
+                         {2})
+
+    def test_columns_stand_in_for_getters(self):
+        site = self.site.parse()
+        self.assertEqual(site.case_names, ['Baz v. Qux', 'Foo v. Bar'])
+        self.assertEqual(site.case_dates, [datetime.date(2015, 1, 4),
+                                           datetime.date(2015, 1, 2)])
+        self.assertEqual(site.precedential_statuses, ['Published'] * 2)
+        self.assertEqual(len(site.download_urls), 2)
+
+
+class RowStreamingTest(unittest.TestCase):
+    def test_streamed_html_matches_tree(self):
+        """Are the same rows found whether or not the page is streamed?"""
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            '../opinions/united_states/state/'
+                            'idaho_civil_example.html')
+        sites = []
+        for streamed in (True, False):
+            site = idaho_civil.Site()
+            site.url = path
+            site.method = 'LOCAL'
+            if not streamed:
+                site.row_tag = None
+                site.row_path = '//li'
+            sites.append(site.parse())
+        self.assertIsNone(sites[0].html)
+        self.assertEqual(len(sites[0].case_names), 302)
+        for attr in ('case_names', 'download_urls', 'case_dates'):
+            self.assertEqual(getattr(sites[0], attr), getattr(sites[1], attr))
+
+    def test_streamed_rss(self):
+        tree_site = ca1.Site()
+        tree_site.url = CA1_EXAMPLE
+        tree_site.method = 'LOCAL'
+        tree_site.parse()
+
+        site = ca1.Site()
+        site.url = CA1_EXAMPLE
+        site.method = 'LOCAL'
+        site.row_tag = 'item'
+        site.stream_format = 'xml'
+        site.row_fields = {'download_urls': 'link/text()'}
+        site._stream_rows()
+        self.assertEqual(sorted(site._columns['download_urls']),
+                         sorted(tree_site.download_urls))
+
+
+    def test_streamed_rows_are_freed(self):
+        """Finished rows and everything before them, including the
+        siblings of their ancestors, are dropped while streaming, and the
+        file is closed afterwards.
+        """
+        sections = ''.join('<div><h2>Section %s</h2><ul><li>'
+                           '<a href="/%s.pdf">Case %s</a></li></ul></div>' %
+                           (i, i, i) for i in range(200))
+        fd, path = tempfile.mkstemp(suffix='.html')
+        with os.fdopen(fd, 'w') as f:
+            f.write('<html><body>%s</body></html>' % sections)
+        tree_sizes = []
+        responses = []
+
+        class Site(AbstractSite):
+            row_tag = 'li'
+            row_fields = {'download_urls': 'a/@href'}
+
+            def _keep_row(self, row):
+                tree_sizes.append(len(list(row.getroottree().iter())))
+                return True
+
+            def tweak_request_object(self, r):
+                responses.append(r)
+
+        site = Site()
+        site.url = path
+        site.method = 'LOCAL'
+        try:
+            site._stream_rows(chunk_size=256)
+        finally:
+            os.remove(path)
+        self.assertEqual(len(site._columns['download_urls']), 200)
+        self.assertLess(max(tree_sizes), 50)
+        self.assertTrue(responses[0].raw.closed)
+
+
+class LazyLinksTest(unittest.TestCase):
+    def test_lazy_links_match_rewritten_links(self):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            '../opinions/united_states/state/'
+                            'nyappdiv_2nd_example_2.html')
+        sites = []
+        for lazy_links in (True, False):
+            site = nyappdiv_2nd.Site()
+            site.url = path
+            site.method = 'LOCAL'
+            site.lazy_links = lazy_links
+            sites.append(site.parse())
+        self.assertTrue(sites[0].download_urls)
+        self.assertEqual(sites[0].download_urls, sites[1].download_urls)
+        # Only the eagerly rewritten page has absolute links throughout.
+        self.assertNotEqual(sites[0].html.xpath('//a/@href'),
+                            sites[1].html.xpath('//a/@href'))
+
+
+class ResultBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.site = ca1.Site()
+        self.site.url = CA1_EXAMPLE
+        self.site.method = 'LOCAL'
+        self.site.parse()
+
+    def test_rows_and_filtering(self):
+        results = self.site.results
+        self.assertEqual(len(results), len(self.site.case_names))
+        self.assertEqual(results[-1].case_names, self.site.case_names[-1])
+        self.assertRaises(AttributeError, lambda: results[0].judges)
+
+        published = self.site.precedential_statuses.count('Published')
+        results.filter(lambda row: row.precedential_statuses == 'Published')
+        self.assertEqual(len(self.site.case_names), published)
+        self.assertEqual(set(self.site.precedential_statuses), {'Published'})
+        lengths = set(len(getattr(self.site, name)) for name in results.names)
+        self.assertEqual(len(lengths), 1)
+
+    def test_sorting_and_serialization(self):
+        results = self.site.results
+        results.sort_by('case_names')
+        self.assertEqual(self.site.case_names, sorted(self.site.case_names))
+
+        items = json.loads(results.to_json())
+        self.assertEqual(len(items), len(results))
+        self.assertEqual(items[0]['case_dates'],
+                         self.site.case_dates[0].isoformat())
+
+        results.extend(self.site.results)
+        self.assertEqual(len(results), len(items) * 2)
+
+    def test_columns_that_are_not_lists(self):
+        self.site.case_names = tuple(self.site.case_names)
+        first = self.site.case_names[0]
+        self.site.results.filter(lambda row: row.case_names == first)
+        self.assertEqual(self.site.case_names, [first])
+        self.assertEqual(len(self.site.download_urls), 1)
+
+
+class ExternalDownloadTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_parse_response_matches_parse(self):
+        """A response downloaded by the caller parses just like one that
+        the Site downloaded itself.
+        """
+        path = CA1_EXAMPLE
+        site = ca1.Site()
+        site.url = path
+        site.method = 'LOCAL'
+        site.parse()
+
+        request = ca1.Site().download_request()
+        self.assertEqual(request['method'], 'GET')
+        self.assertEqual(request['url'], ca1.Site().url)
+
+        external_site = ca1.Site()
+        external_site.url = path
+        external_site.parse_response(MockRequest(url=path).get())
+        self.assertEqual(external_site.case_names, site.case_names)
+        self.assertEqual(external_site.hash, site.hash)
+
+
+class DownloadTest(unittest.TestCase):
+    """Serves files from memory through an adapter mounted on the shared
+    session for files.example.com.
+    """
+    base_url = 'http://files.example.com/'
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.files = {}
+        files = self.files
+
+        class BrokenStream(io.BytesIO):
+            def read(self, *args, **kwargs):
+                if self.tell():
+                    raise IOError('Connection dropped')
+                return io.BytesIO.read(self, *args, **kwargs)
+
+        class FileAdapter(HTTPAdapter):
+            def send(self, request, **kwargs):
+                content = files[request.url]
+                r = Response()
+                r.status_code = 200
+                r.url = request.url
+                r.request = request
+                if content is None:
+                    r.raw = BrokenStream('x' * 10)
+                else:
+                    r.raw = io.BytesIO(content)
+                return r
+
+        get_session(self.base_url).mount(self.base_url, FileAdapter())
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        close_sessions()
+        configure_rate_limits()
+        shutil.rmtree(self.directory)
+        logging.disable(logging.NOTSET)
+
+    def add_file(self, name, content):
+        url = self.base_url + name
+        self.files[url] = content
+        return url
+
+    def test_download_binary(self):
+        content = 'Opinion text ' * 10000
+        url = self.add_file('opinion.pdf', content)
+        sha1 = hashlib.sha1(content).hexdigest()
+        result = download_binary(AbstractSite(), url, chunk_size=1024,
+                                 directory=self.directory)
+        self.assertEqual(result.sha1, sha1)
+        self.assertEqual(result.size, len(content))
+        with open(result.path, 'rb') as f:
+            self.assertEqual(f.read(), content)
+
+        result = download_binary(AbstractSite(), url, known_hashes={sha1},
+                                 directory=self.directory)
+        self.assertTrue(result.known)
+        self.assertEqual(result.sha1, sha1)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+    def test_failed_downloads_leave_no_files(self):
+        empty = self.add_file('empty.pdf', '')
+        broken = self.add_file('broken.pdf', None)
+        self.assertRaises(EmptyFileException, download_binary,
+                          AbstractSite(), empty, directory=self.directory)
+        self.assertRaises(IOError, download_binary, AbstractSite(), broken,
+                          chunk_size=5, directory=self.directory)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_download_binaries(self):
+        urls = [self.add_file('%s.pdf' % i, str(i) * (i + 1))
+                for i in range(6)]
+        urls.insert(3, self.add_file('empty.pdf', ''))
+        results = list(download_binaries(AbstractSite(), urls, max_workers=3,
+                                         directory=self.directory))
+        self.assertEqual(sorted(index for index, _, _ in results),
+                         range(len(urls)))
+        for index, result, error in results:
+            if index == 3:
+                self.assertIsNone(result)
+                self.assertIn('EmptyFileException', error)
+                continue
+            self.assertIsNone(error)
+            # Each index points back at the URL the result came from.
+            self.assertEqual(result.url, urls[index])
+            with open(result.path, 'rb') as f:
+                self.assertEqual(f.read(), self.files[urls[index]])
+
+
+class DeferredFileHandlerTest(unittest.TestCase):
+    def test_unwritable_log_file_does_not_raise(self):
+        handler = DeferredFileHandler('/nonexistent/juriscraper/debug.log')
+        test_logger = logging.getLogger('DeferredFileHandlerTest')
+        test_logger.addHandler(handler)
+        raise_exceptions = logging.raiseExceptions
+        logging.raiseExceptions = False
+        try:
+            test_logger.error('Nowhere to write this.')
+            handler.flush()
+        finally:
+            logging.raiseExceptions = raise_exceptions
+            test_logger.removeHandler(handler)
+            handler.close()
+        self.assertIsNone(handler.handler)
+
+
+class HttpUtilsTest(unittest.TestCase):
+    def test_sessions_are_shared_per_host(self):
+        s = get_session('http://www.example.com/path/')
+        self.assertIs(s, get_session('http://WWW.EXAMPLE.COM/other.html'))
+        self.assertIsNot(s, get_session('http://example.org/'))
+        self.assertEqual(s.headers['User-Agent'], 'Juriscraper')
+
+    def test_rate_limiter_waits_and_backs_off(self):
+        limiter = RateLimiter(rate=50, burst=2, max_backoff=1)
+        start = time.time()
+        for _ in range(4):
+            limiter.acquire()
+        # Two tokens were there already; the others took 1/50th of a second.
+        self.assertGreaterEqual(time.time() - start, 0.03)
+
+        limiter.throttled()
+        limiter.throttled()
+        self.assertEqual(limiter.current_rate, 12.5)
+        self.assertEqual(limiter.backoff, 0.04)
+        start = time.time()
+        limiter.acquire()
+        self.assertGreaterEqual(time.time() - start, 0.035)
+
+        for _ in range(10):
+            limiter.succeeded()
+        self.assertEqual(limiter.current_rate, 50)
+
+    def test_sessions_back_off_from_hosts_that_push_back(self):
+        class TooManyRequestsAdapter(HTTPAdapter):
+            def send(self, request, **kwargs):
+                r = Response()
+                r.status_code = 429
+                r.url = request.url
+                r.request = request
+                return r
+
+        url = 'http://busy.example.com/'
+        try:
+            s = get_session(url)
+            s.mount(url, TooManyRequestsAdapter())
+            s.get(url)
+            limiter = get_rate_limiter(url)
+            self.assertLess(limiter.current_rate, limiter.rate)
+            self.assertGreater(limiter.backoff, 0)
+        finally:
+            close_sessions()
+            configure_rate_limits()
+
+    def test_sites_keep_their_own_cookies(self):
+        sent = []
+
+        class SessionCookieAdapter(HTTPAdapter):
+            def send(self, request, **kwargs):
+                sent.append(request.headers.get('Cookie'))
+                r = Response()
+                r.status_code = 200
+                r.url = request.url
+                r.request = request
+                r.cookies = cookiejar_from_dict({'SessionId': 'abc'})
+                return r
+
+        url = 'http://cookies.example.com/'
+        try:
+            get_session(url).mount(url, SessionCookieAdapter())
+            site = AbstractSite()
+            site._send('GET', url)
+            site._send('GET', url, cookies={'extra': '1'})
+            AbstractSite()._send('GET', url)
+        finally:
+            close_sessions()
+            configure_rate_limits()
+        self.assertIsNone(sent[0])
+        self.assertEqual(sorted(sent[1].split('; ')),
+                         ['SessionId=abc', 'extra=1'])
+        # Neither the shared session nor other Sites get the cookie.
+        self.assertIsNone(sent[2])
+
+
 if __name__ == '__main__':
     unittest.main()